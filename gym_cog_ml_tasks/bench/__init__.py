@@ -0,0 +1,7 @@
+"""
+Benchmarks of the envs, each module can be run on its own, e.g.
+$ python -m gym_cog_ml_tasks.bench.ax_12_cpt_reset
+
+The package itself runs the suite over every registered env, see suite.py:
+$ python -m gym_cog_ml_tasks.bench --output bench.json
+"""
@@ -0,0 +1,3 @@
+from gym_cog_ml_tasks.bench.suite import main
+
+main()
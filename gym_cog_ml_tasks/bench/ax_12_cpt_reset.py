@@ -0,0 +1,48 @@
+"""
+reset latency of AX_12_CPT_ENV versus size, comparing the reference loop generator
+with the vectorized one used by reset().
+
+$ python -m gym_cog_ml_tasks.bench.ax_12_cpt_reset
+"""
+
+import argparse
+import timeit
+
+from gym_cog_ml_tasks.envs import AX_12_CPT_ENV
+
+
+def bench(sizes, repeat=5, loop_max_size=10 ** 5):
+    """
+    :param sizes: the size params to measure
+    :param repeat: the number of timed resets per size, the best one is reported
+    :param loop_max_size: the reference loop is skipped above this size since it takes minutes
+    :return: a list of (size, loop seconds or None, vectorized seconds)
+    """
+    env = AX_12_CPT_ENV(size=1)
+    results = []
+    for size in sizes:
+        env.size = size
+        fast = min(timeit.repeat(env.reset, number=1, repeat=repeat))
+        slow = None
+        if size <= loop_max_size:
+            slow = min(timeit.repeat(env._generate_input_target_loop, number=1, repeat=repeat))
+        results.append((size, slow, fast))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("%10s %14s %14s %10s" % ("size", "loop (ms)", "reset (ms)", "speedup"))
+    for size, slow, fast in bench(args.sizes, args.repeat):
+        if slow is None:
+            print("%10d %14s %14.3f %10s" % (size, "-", fast * 1e3, "-"))
+        else:
+            print("%10d %14.3f %14.3f %9.1fx" % (size, slow * 1e3, fast * 1e3, slow / fast))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+input generation of the v1 copy tasks in 'major' and 'minor' modes across n_char, size and n_exclude, comparing the
+former generators (a loop over the positions for 'major', rejection of full inputs for 'minor', per episode and
+over a batch) with the exact samplers used now.
+
+$ python -m gym_cog_ml_tasks.bench.copy_sampling
+"""
+
+import argparse
+import string
+import timeit
+
+import numpy as np
+
+from gym_cog_ml_tasks.envs.copy_tasks.copy_sampling import sample_major, sample_minor
+
+ALPHABET = list(string.ascii_uppercase)
+
+
+def loop_major(rng, size, n_char, n_exclude):
+    # the former _gen_major: the candidates of each position are rebuilt, then one char is drawn
+    input_str = ""
+    for i in range(size):
+        candidates = ALPHABET[:n_char]
+        for j in range(n_exclude):
+            candidates.remove(ALPHABET[(i + j) % n_char])
+        input_str += rng.choice(candidates)
+    return input_str
+
+
+def loop_minor(rng, size, n_char, n_exclude):
+    # the former _gen_minor: full inputs are drawn until one has an excluded char
+    while True:
+        input_str = "".join(rng.choice(ALPHABET[:n_char], size=size))
+        for i in range(size):
+            if input_str[i] in [ALPHABET[(i + j) % n_char] for j in range(n_exclude)]:
+                return input_str
+
+
+def rejection_minor(rng, n_episodes, size, n_char, n_exclude):
+    # the former vectorized minor mode: the rows without an excluded char are drawn again
+    pos = np.arange(size)
+    inputs = rng.choice(n_char, size=(n_episodes, size))
+    redo = ~((inputs - pos) % n_char < n_exclude).any(axis=1)
+    while redo.any():
+        inputs[redo] = rng.choice(n_char, size=(int(redo.sum()), size))
+        redo[redo] = ~((inputs[redo] - pos) % n_char < n_exclude).any(axis=1)
+    return inputs
+
+
+def best(f, repeat):
+    return min(timeit.repeat(f, number=1, repeat=repeat))
+
+
+def bench(cases, batch, repeat):
+    """
+    :param cases: (n_char, size, n_exclude) triples
+    :param batch: the number of episodes of the batched measures
+    :return: a list of (mode, n_char, size, n_exclude, loop s/episode, new s/episode,
+             former batch s/batch or None, new batch s/batch)
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for n_char, size, n_exclude in cases:
+        if n_exclude < n_char:
+            loop = best(lambda: loop_major(rng, size, n_char, n_exclude), repeat)
+            one = best(lambda: sample_major(rng, 1, size, n_char, n_exclude), repeat)
+            many = best(lambda: sample_major(rng, batch, size, n_char, n_exclude), repeat)
+            results.append(("major", n_char, size, n_exclude, loop, one, None, many))
+        loop = best(lambda: loop_minor(rng, size, n_char, n_exclude), repeat)
+        one = best(lambda: sample_minor(rng, 1, size, n_char, n_exclude), repeat)
+        former = best(lambda: rejection_minor(rng, batch, size, n_char, n_exclude), repeat)
+        many = best(lambda: sample_minor(rng, batch, size, n_char, n_exclude), repeat)
+        results.append(("minor", n_char, size, n_exclude, loop, one, former, many))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n-chars", type=int, nargs="+", default=[5, 26])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 100, 1000])
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = []
+    for n_char in args.n_chars:
+        for size in args.sizes:
+            for n_exclude in sorted({1, n_char // 2, n_char - 1}):
+                cases.append((n_char, size, n_exclude))
+    print("%-6s %6s %6s %9s %14s %14s %9s %14s %14s %9s" % (
+        "mode", "n_char", "size", "n_exclude", "loop (us)", "sampler (us)", "speedup",
+        "batch old (ms)", "batch new (ms)", "speedup"))
+    for mode, n_char, size, n_exclude, loop, one, former, many in bench(cases, args.batch, args.repeat):
+        batch_old = "%14.3f" % (former * 1e3) if former is not None else "%14s" % "-"
+        batch_speedup = "%8.1fx" % (former / many) if former is not None else "%9s" % "-"
+        print("%-6s %6d %6d %9d %14.1f %14.1f %8.1fx %s %14.3f %s" % (
+            mode, n_char, size, n_exclude, loop * 1e6, one * 1e6, loop / one, batch_old, many * 1e3, batch_speedup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+reset() latency, steps/sec and episode bytes of the copy tasks in token mode versus the size of the vocabulary,
+with the string episodes of the default mode as a reference for n_char <= 26.
+
+$ python -m gym_cog_ml_tasks.bench.copy_tokens --n-chars 26 1000 65000 100000 --size 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gym_cog_ml_tasks.envs.task_env import make_task
+
+COPY_IDS = ["Simple_Copy-v0", "Simple_Copy-v1", "Simple_Copy_Repeat-v0", "Simple_Copy_Repeat-v1"]
+
+
+def reset_latency(env, n_resets):
+    reset = env.reset
+    start = time.perf_counter()
+    for _ in range(n_resets):
+        reset()
+    return (time.perf_counter() - start) / n_resets
+
+
+def steps_per_sec(env, n_steps, seed=0):
+    """
+    :return: the steps/sec of env over n_steps random actions, resets excluded
+    """
+    actions = np.random.default_rng(seed).integers(env.action_space.n, size=n_steps).tolist()
+    env.reset()
+    step, reset = env.step, env.reset
+    elapsed = 0.0
+    start = time.perf_counter()
+    for a in actions:
+        if step(a)[2]:
+            elapsed += time.perf_counter() - start
+            reset()
+            start = time.perf_counter()
+    return n_steps / (elapsed + time.perf_counter() - start)
+
+
+def bench(env_ids, n_chars, size, n_resets, n_steps):
+    """
+    :return: a list of (env_id, n_char, mode, reset s, steps/sec, bytes of the obs and target of an episode)
+    """
+    results = []
+    for env_id in env_ids:
+        for n_char in n_chars:
+            modes = ["tokens", "strings"] if n_char <= 26 else ["tokens"]
+            for mode in modes:
+                env = make_task(env_id, n_char=n_char, size=size, tokens=mode == "tokens", defer_reset=True)
+                env.seed(0)
+                latency = reset_latency(env, n_resets)
+                rate = steps_per_sec(env, n_steps)
+                if mode == "tokens":
+                    nbytes = env.episode_nbytes
+                else:
+                    nbytes = len(env.input_str) + len(env.target_str)
+                results.append((env_id, n_char, mode, latency, rate, nbytes))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", nargs="+", default=COPY_IDS)
+    parser.add_argument("--n-chars", type=int, nargs="+", default=[26, 1000, 10000, 65000, 100000])
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--resets", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=200000)
+    args = parser.parse_args()
+
+    print("%-24s %8s %8s %12s %14s %14s" % ("env", "n_char", "mode", "reset (ms)", "steps/s", "episode bytes"))
+    for env_id, n_char, mode, latency, rate, nbytes in bench(args.ids, args.n_chars, args.size, args.resets,
+                                                             args.steps):
+        print("%-24s %8d %8s %12.3f %14.0f %14d" % (env_id, n_char, mode, latency * 1e3, rate, nbytes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+footprint and read throughput of packed corpora against plain ones: the bytes per step of the file, the write time,
+and the steps/sec read by EpisodeCorpus.windows() (batches of random windows) and EpisodeCorpus.episodes() (batches
+of random episodes).
+
+$ python -m gym_cog_ml_tasks.bench.corpus_packed --ids 12_AX-v0 12_AX_CPT-v0 --episodes 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from gym_cog_ml_tasks.corpus import EpisodeCorpus, HEADER_SIZE, write_corpus
+
+
+def read_rate(read, n_batches, steps_per_batch):
+    start = time.perf_counter()
+    for _ in range(n_batches):
+        read()
+    return n_batches * steps_per_batch / (time.perf_counter() - start)
+
+
+def bench(env_ids, n_episodes, batch, window, n_batches, directory):
+    """
+    :return: a list of (env_id, format, bytes/step, write s, window steps/s, episode steps/s)
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for env_id in env_ids:
+        for packed in (False, True):
+            path = os.path.join(directory, "%s.%s.bin" % (env_id, "packed" if packed else "plain"))
+            start = time.perf_counter()
+            write_corpus(path, env_id, n_episodes, seed=0, packed=packed)
+            write_s = time.perf_counter() - start
+            corpus = EpisodeCorpus(path)
+            nbytes = (os.path.getsize(path) - HEADER_SIZE) / corpus.n_tokens
+            starts = rng.integers(0, corpus.n_tokens - window + 1, size=batch)
+            windows = read_rate(lambda: corpus.windows(starts, window), n_batches, batch * window)
+            indices = rng.integers(0, len(corpus), size=batch)
+            steps = int(corpus.lengths[indices].sum(dtype=np.int64))
+            episodes = read_rate(lambda: corpus.episodes(indices), n_batches, steps)
+            results.append((env_id, "packed" if packed else "plain", nbytes, write_s, windows, episodes))
+            del corpus
+            os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", nargs="+", default=["12_AX-v0", "AX_CPT-v0", "12_AX_CPT-v0"])
+    parser.add_argument("--episodes", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--window", type=int, default=64)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--dir", default=None, help="where to write the corpora, default a temporary directory")
+    args = parser.parse_args()
+
+    print("%-16s %8s %12s %10s %18s %18s" % ("env", "format", "bytes/step", "write (s)", "window steps/s",
+                                              "episode steps/s"))
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for env_id, fmt, nbytes, write_s, windows, episodes in bench(args.ids, args.episodes, args.batch, args.window,
+                                                                     args.batches, directory):
+            print("%-16s %8s %12.3f %10.2f %18.0f %18.0f" % (env_id, fmt, nbytes, write_s, windows, episodes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+lane-steps/sec of AX_Shared_Vector_ENV versus its number of workers, against AX_Vector_ENV in one process.
+
+$ python -m gym_cog_ml_tasks.bench.shared_vector --lanes 65536 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from gym_cog_ml_tasks.envs import AX_12_CPT_ENV, AX_Shared_Vector_ENV, AX_Vector_ENV
+
+
+def lane_steps_per_sec(env, n_steps, seed=0):
+    """
+    :return: the lane-steps/sec of a vector env over n_steps random action vectors, lane resets included
+    """
+    rng = np.random.default_rng(seed)
+    actions = [rng.integers(env.single_action_space.n, size=env.num_envs) for _ in range(16)]
+    env.reset()
+    step = env.step
+    start = time.perf_counter()
+    for i in range(n_steps):
+        step(actions[i % 16])
+    return n_steps * env.num_envs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lanes", type=int, default=2 ** 14)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=1000)
+    args = parser.parse_args()
+
+    base = lane_steps_per_sec(AX_Vector_ENV(AX_12_CPT_ENV, num_envs=args.lanes, copy=False, size=args.size), args.steps)
+    print("%-28s %16s %10s" % ("env", "lane-steps/s", "speedup"))
+    print("%-28s %16.0f %9.2fx" % ("AX_Vector_ENV", base, 1.0))
+    for n in sorted(set(args.workers)):
+        env = AX_Shared_Vector_ENV(AX_12_CPT_ENV, num_envs=args.lanes, num_workers=n, copy=False, size=args.size)
+        try:
+            rate = lane_steps_per_sec(env, args.steps)
+        finally:
+            env.close()
+        print("%-28s %16.0f %9.2fx" % ("shared, %d workers" % n, rate, rate / base))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+startup costs: the import time of the package, measured in fresh interpreters, and the construction time of
+every registered env with and without defer_reset.
+
+$ python -m gym_cog_ml_tasks.bench.startup
+"""
+
+import argparse
+import subprocess
+import sys
+import timeit
+
+from gym_cog_ml_tasks.envs.task_env import make_task, registered_ids
+
+IMPORTS = [
+    "import gym",
+    "import gym_cog_ml_tasks",
+    "import gym_cog_ml_tasks.envs",
+    "from gym_cog_ml_tasks.envs import Saccade_ENV",
+]
+
+
+def import_time(statement, repeat=5):
+    """
+    :param statement: an import statement
+    :return: the best time of the statement in a fresh interpreter, in seconds
+    """
+    code = "import time; t = time.perf_counter(); %s; print(time.perf_counter() - t)" % statement
+    output = [subprocess.check_output([sys.executable, "-c", code], stderr=subprocess.DEVNULL) for _ in range(repeat)]
+    return min(float(t) for t in output)
+
+
+def construct_time(env_id, repeat=5, **kwargs):
+    return min(timeit.repeat(lambda: make_task(env_id, **kwargs), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", nargs="+", default=registered_ids())
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("%-48s %14s" % ("statement", "time (ms)"))
+    for statement in IMPORTS:
+        print("%-48s %14.1f" % (statement, import_time(statement, args.repeat) * 1e3))
+    print()
+    print("%-24s %14s %14s %10s" % ("env", "construct (ms)", "deferred (ms)", "speedup"))
+    for env_id in args.ids:
+        eager = construct_time(env_id, args.repeat)
+        deferred = construct_time(env_id, args.repeat, defer_reset=True)
+        print("%-24s %14.3f %14.3f %9.1fx" % (env_id, eager * 1e3, deferred * 1e3, eager / deferred))
+
+
+if __name__ == "__main__":
+    main()
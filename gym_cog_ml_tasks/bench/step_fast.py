@@ -0,0 +1,60 @@
+"""
+steps/sec of every registered env under a random policy, with the default string episodes and with fast=True.
+
+$ python -m gym_cog_ml_tasks.bench.step_fast
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs.task_env import SeqTaskEnv, make_task, registered_ids
+
+
+def steps_per_sec(env, n_steps, seed=0):
+    """
+    :return: the steps/sec of env over n_steps random actions, resets included
+    """
+    actions = np.random.default_rng(seed).integers(env.action_space.n, size=n_steps).tolist()
+    env.reset()
+    step, reset = env.step, env.reset
+    start = time.perf_counter()
+    for a in actions:
+        if step(a)[2]:
+            reset()
+    return n_steps / (time.perf_counter() - start)
+
+
+def bench(env_ids, n_steps):
+    """
+    :return: a list of (env_id, steps/sec, fast steps/sec or None)
+    """
+    results = []
+    for env_id in env_ids:
+        env = make_task(env_id)
+        slow = steps_per_sec(env, n_steps)
+        fast = None
+        if isinstance(env, SeqTaskEnv):
+            fast = steps_per_sec(make_task(env_id, fast=True), n_steps)
+        results.append((env_id, slow, fast))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", nargs="+", default=registered_ids())
+    parser.add_argument("--steps", type=int, default=200000)
+    args = parser.parse_args()
+
+    print("%-24s %14s %14s %10s" % ("env", "steps/s", "fast steps/s", "speedup"))
+    for env_id, slow, fast in bench(args.ids, args.steps):
+        if fast is None:
+            print("%-24s %14.0f %14s %10s" % (env_id, slow, "-", "-"))
+        else:
+            print("%-24s %14.0f %14.0f %9.1fx" % (env_id, slow, fast, fast / slow))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+benchmark suite over every registered env id: gym.make time, reset latency versus the size param,
+steps/sec under a random policy and peak memory. The results are written as json, and can be compared
+with a stored baseline, the run failing when a metric regressed by more than a threshold.
+
+$ python -m gym_cog_ml_tasks.bench --output bench.json
+$ python -m gym_cog_ml_tasks.bench --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+import warnings
+
+import gym
+import numpy as np
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs.task_env import make_task, registered_ids
+
+# the metrics where a larger value is better, the others being costs
+HIGHER_IS_BETTER = ("steps_per_sec",)
+
+
+def random_steps(env, n_steps, seed=0):
+    # n_steps random actions, resetting at the end of each episode
+    actions = np.random.default_rng(seed).integers(env.action_space.n, size=n_steps).tolist()
+    step, reset = env.step, env.reset
+    for a in actions:
+        if step(a)[2]:
+            reset()
+
+
+def has_size(env_id):
+    return "size" in inspect.signature(gym.envs.registration.load(gym.spec(env_id).entry_point)).parameters
+
+
+def bench_env(env_id, sizes, n_steps, repeat):
+    """
+    :param env_id: the registered id of the env
+    :param sizes: the size params the reset latency is measured at, for the envs having one
+    :param n_steps: the number of random steps timed
+    :param repeat: the number of timings per measure, the best one is reported
+    :return: a dict of the metrics of the env
+    """
+    result = {}
+    result["make_s"] = min(timeit.repeat(lambda: gym.make(env_id), number=1, repeat=repeat))
+
+    env = gym.make(env_id)
+    env.reset()
+    result["reset_s"] = min(timeit.repeat(env.reset, number=1, repeat=repeat))
+    if has_size(env_id):
+        result["reset_s_vs_size"] = {}
+        for size in sizes:
+            task = make_task(env_id, size=size)
+            result["reset_s_vs_size"][str(size)] = min(timeit.repeat(task.reset, number=1, repeat=repeat))
+
+    # warm up first, the checker wrappers only look at the first steps
+    random_steps(env, min(n_steps, 1000), seed=1)
+    env.reset()
+    start = time.perf_counter()
+    random_steps(env, n_steps)
+    result["steps_per_sec"] = n_steps / (time.perf_counter() - start)
+
+    # measured apart, tracing the allocations slows everything down
+    tracemalloc.start()
+    env = gym.make(env_id)
+    env.reset()
+    random_steps(env, min(n_steps, 10000))
+    result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def run(env_ids, sizes, n_steps, repeat=5):
+    """
+    :return: the results of the suite, a json serializable dict
+    """
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "gym": gym.__version__,
+            "n_steps": n_steps,
+            "repeat": repeat,
+        },
+        "envs": {},
+    }
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for env_id in env_ids:
+            results["envs"][env_id] = bench_env(env_id, sizes, n_steps, repeat)
+    return results
+
+
+def flatten(metrics, prefix=""):
+    # {"a": {"b": 1}} -> {"a/b": 1}
+    flat = {}
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + "/"))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(results, baseline, threshold):
+    """
+    :param results: the results of run()
+    :param baseline: the results of a previous run
+    :param threshold: the relative slowdown tolerated, e.g. 0.2 for 20%
+    :return: a list of (metric, baseline value, value, relative change) of the regressed metrics,
+             the change being positive when worse
+    """
+    regressions = []
+    for env_id, metrics in results["envs"].items():
+        if env_id not in baseline["envs"]:
+            continue
+        old = flatten(baseline["envs"][env_id])
+        for key, value in flatten(metrics).items():
+            if key not in old or not old[key] or not value:
+                continue
+            if key.split("/")[0] in HIGHER_IS_BETTER:
+                change = old[key] / value - 1
+            else:
+                change = value / old[key] - 1
+            if change > threshold:
+                regressions.append((env_id + "/" + key, old[key], value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", nargs="+", default=registered_ids())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10 ** 4])
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="the json file to write the results to, default stdout")
+    parser.add_argument("--baseline", help="a json file written by a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="the relative regression tolerated before failing, default 0.2")
+    args = parser.parse_args()
+
+    results = run(args.ids, args.sizes, args.steps, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for key, old, new, change in regressions:
+            print("REGRESSION %-40s %14.6g -> %14.6g (%+.0f%%)" % (key, old, new, change * 100), file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("no regression above %.0f%% against %s" % (args.threshold * 100, args.baseline), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+On-disk corpus of generated episodes.
+
+A corpus file holds the episodes of one env with fixed params, so that the same evaluation set can be
+shared by many runs and processes. Layout:
+- [0, 8): the magic bytes b"COGCORP1"
+- [8, 16): the length of the header, uint64
+- [16, HEADER_SIZE): the header, utf-8 json: env_id, kwargs, seed, n_episodes, n_tokens, dtype, offsets_start, and
+  how the seed was used, as the episodes depend on it: chunk_size for write_corpus, seeding and shard_size for
+  write_corpus_parallel
+- [HEADER_SIZE, ...): the tokens, a (n_tokens, 2) array of obs and target indices, episode after episode
+- [offsets_start, ...): the offsets, int64 (n_episodes + 1,), episode i being tokens[offsets[i]:offsets[i + 1]]
+
+The tokens are stored as uint8, or a larger unsigned int type when the vocabulary does not fit.
+EpisodeCorpus memory-maps the file, so episodes are served as views without copy and the pages are shared
+between the processes reading the same file.
+
+A packed corpus (write_corpus(..., packed=True), the header then has packed_bits: [obs_bits, target_bits]) stores
+each token in obs_bits + target_bits bits instead, e.g. 3 + 1 for the AX tasks: the tokens are a bit stream, token i
+being bits [i * width, (i + 1) * width), the obs bits then the target bits, most significant first, packed by
+np.packbits. The offsets are replaced by the episode lengths, in the smallest unsigned int type holding them,
+at lengths_start, and by every OFFSET_STRIDE-th offset, int64, at offsets_start. The episodes are then unpacked when
+read, as copies; windows() and episodes() unpack a batch at once.
+"""
+
+import json
+
+import numpy as np
+
+from gym_cog_ml_tasks.envs.task_env import make_task, uint_dtype
+
+MAGIC = b"COGCORP1"
+HEADER_SIZE = 4096
+# the episodes between two offsets stored by a packed corpus
+OFFSET_STRIDE = 64
+
+
+def token_dtype(env):
+    # the smallest unsigned int type holding the obs and action indices of an env
+    return uint_dtype(max(env.n_obs, env.action_space.n))
+
+
+def token_bits(env):
+    # the number of bits of the obs and action indices of an env, as packed by write_corpus(..., packed=True)
+    return [max(int(env.n_obs - 1).bit_length(), 1), max(int(env.action_space.n - 1).bit_length(), 1)]
+
+
+def write_corpus(path, env_id, n_episodes, seed=None, chunk_size=10000, packed=False, **kwargs):
+    """
+    generate n_episodes of an env and write them to a corpus file.
+    :param path: the file to write
+    :param env_id: the registered id of the env, e.g. '12_AX_CPT-v0'
+    :param n_episodes: the number of episodes
+    :param seed: the seed of the env
+    :param chunk_size: the number of episodes generated at once, bounding the memory used; the episodes drawn depend
+                       on it, it is recorded in the header
+    :param packed: store the tokens as a bit stream of token_bits(env) bits each, see the module doc
+    :param kwargs: the params of the env
+    :return: the seed used
+    """
+    env = make_task(env_id, **kwargs)
+    seed = int(env.seed(seed)[0])
+
+    def batches():
+        done = 0
+        while done < n_episodes:
+            n = min(chunk_size, n_episodes - done)
+            yield env._generate_batch(n)
+            done += n
+
+    write_batches(path, env_id, kwargs, seed, batches(), dtype=token_dtype(env),
+                  packed_bits=token_bits(env) if packed else None, chunk_size=chunk_size)
+    return seed
+
+
+def _pack_tokens(obs, target, packed_bits, carry):
+    """
+    :param carry: the bits left over by the previous call, fewer than 8
+    :return: the packed bytes of the whole bytes of carry and the tokens, and the bits left over
+    """
+    obs_bits, target_bits = packed_bits
+    width = obs_bits + target_bits
+    dtype = uint_dtype(1 << width)
+    codes = obs.astype(dtype) << dtype.type(target_bits) | target.astype(dtype)
+    bits = (codes[:, None] >> np.arange(width - 1, -1, -1, dtype=dtype) & 1).astype(np.uint8).ravel()
+    bits = np.concatenate([carry, bits])
+    n_whole = len(bits) // 8 * 8
+    return np.packbits(bits[:n_whole]).tobytes(), bits[n_whole:]
+
+
+def _unpack_windows(packed, starts, length, packed_bits, dtype):
+    # the obs and target indices of shape (N, length) of the windows of tokens starting at starts
+    obs_bits, target_bits = packed_bits
+    width = obs_bits + target_bits
+    first = starts * width
+    n_bytes = (7 + length * width + 7) // 8
+    idx = np.minimum((first >> 3)[:, None] + np.arange(n_bytes), len(packed) - 1)
+    bits = np.unpackbits(packed[idx], axis=1)
+    bits = np.take_along_axis(bits, (first & 7)[:, None] + np.arange(length * width), axis=1)
+    bits = bits.reshape(len(starts), length, width)
+    code_type = uint_dtype(1 << width)
+    codes = np.zeros((len(starts), length), dtype=code_type)
+    for j in range(width):
+        codes <<= code_type.type(1)
+        codes |= bits[..., j]
+    obs = (codes >> code_type.type(target_bits)).astype(dtype)
+    target = (codes & code_type.type((1 << target_bits) - 1)).astype(dtype)
+    return obs, target
+
+
+def write_batches(path, env_id, kwargs, seed, batches, dtype=np.uint8, packed_bits=None, **header):
+    """
+    write episodes generated as batches to a corpus file.
+    :param path: the file to write
+    :param env_id: the registered id of the env
+    :param kwargs: the params of the env
+    :param seed: the seed the episodes were generated with
+    :param batches: an iterable of (obs, target, lengths), as returned by _generate_batch
+    :param dtype: the type of the stored tokens, or of the unpacked ones
+    :param packed_bits: the [obs_bits, target_bits] of a packed corpus, see token_bits, default not packed
+    :param header: extra json fields of the header, e.g. how the seed was used
+    :return: the number of episodes written
+    """
+    dtype = np.dtype(dtype)
+    offsets = [np.zeros(1, dtype=np.int64)]
+    n_tokens = 0
+    carry = np.zeros(0, dtype=np.uint8)
+    with open(path, "wb") as f:
+        f.seek(HEADER_SIZE)
+        for obs, target, lengths in batches:
+            mask = np.arange(obs.shape[1]) < lengths[:, None]
+            if packed_bits is None:
+                f.write(np.stack([obs[mask], target[mask]], axis=1).astype(dtype).tobytes())
+            else:
+                data, carry = _pack_tokens(obs[mask], target[mask], packed_bits, carry)
+                f.write(data)
+            offsets.append(n_tokens + np.cumsum(lengths, dtype=np.int64))
+            n_tokens = int(offsets[-1][-1]) if len(lengths) else n_tokens
+        offsets = np.concatenate(offsets)
+
+        if packed_bits is None:
+            offsets_start = HEADER_SIZE + n_tokens * 2 * dtype.itemsize
+        else:
+            f.write(np.packbits(carry).tobytes())
+            lengths = np.diff(offsets)
+            lengths = lengths.astype(uint_dtype(int(lengths.max(initial=0)) + 1))
+            header["lengths_start"] = HEADER_SIZE + -(-n_tokens * sum(packed_bits) // 8)
+            header["lengths_dtype"] = lengths.dtype.name
+            f.write(lengths.tobytes())
+            offsets_start = header["lengths_start"] + lengths.nbytes
+            offsets = offsets[::OFFSET_STRIDE]
+        offsets_start += -offsets_start % offsets.itemsize
+        f.seek(offsets_start)
+        f.write(offsets.tobytes())
+        n_episodes = len(lengths) if packed_bits is not None else len(offsets) - 1
+
+        header.update({
+            "env_id": env_id,
+            "kwargs": kwargs,
+            "seed": seed,
+            "n_episodes": n_episodes,
+            "n_tokens": n_tokens,
+            "dtype": dtype.name,
+            "offsets_start": offsets_start,
+        })
+        if packed_bits is not None:
+            header["packed_bits"] = [int(b) for b in packed_bits]
+        header = json.dumps(header).encode("utf-8")
+        if len(header) > HEADER_SIZE - 16:
+            raise ValueError("corpus header too large: %d bytes" % len(header))
+        f.seek(0)
+        f.write(MAGIC + np.uint64(len(header)).tobytes() + header)
+    return n_episodes
+
+
+class EpisodeCorpus(object):
+
+    def __init__(self, path):
+        """
+        :param path: a file written by write_corpus
+        """
+        self.path = path
+        self._raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if self._raw[:8].tobytes() != MAGIC:
+            raise ValueError("not an episode corpus: %s" % path)
+        header_len = int(self._raw[8:16].view(np.uint64)[0])
+        self.header = json.loads(self._raw[16:16 + header_len].tobytes().decode("utf-8"))
+
+        self.env_id = self.header["env_id"]
+        self.kwargs = self.header["kwargs"]
+        self.seed = self.header["seed"]
+        self.dtype = dtype = np.dtype(self.header["dtype"])
+        self.n_tokens = n_tokens = self.header["n_tokens"]
+        self.n_episodes = n_episodes = self.header["n_episodes"]
+        start = self.header["offsets_start"]
+        # the [obs_bits, target_bits] of a packed corpus, see the module doc
+        self.packed_bits = self.header.get("packed_bits")
+        if self.packed_bits is None:
+            self.packed = None
+            self.tokens = self._raw[HEADER_SIZE:HEADER_SIZE + n_tokens * 2 * dtype.itemsize].view(dtype).reshape(
+                n_tokens, 2)
+            self.offsets = self._raw[start:start + (n_episodes + 1) * 8].view(np.int64)
+            self._lengths = None
+        else:
+            self.packed = self._raw[HEADER_SIZE:HEADER_SIZE + -(-n_tokens * sum(self.packed_bits) // 8)]
+            self.tokens = None
+            # every OFFSET_STRIDE-th offset, the others are summed from the lengths
+            self.offsets = self._raw[start:start + (n_episodes // OFFSET_STRIDE + 1) * 8].view(np.int64)
+            lengths_dtype = np.dtype(self.header["lengths_dtype"])
+            lengths_start = self.header["lengths_start"]
+            self._lengths = self._raw[lengths_start:lengths_start + n_episodes * lengths_dtype.itemsize].view(
+                lengths_dtype)
+
+    def __len__(self):
+        return self.n_episodes
+
+    def __getitem__(self, i):
+        """
+        :return: the obs and target indices of episode i, read-only views of the file, or unpacked copies
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("episode index out of range: %d" % i)
+        if self.packed is not None:
+            obs, target = self._read(self.starts([i]), int(self._lengths[i]))
+            return obs[0], target[0]
+        episode = self.tokens[self.offsets[i]:self.offsets[i + 1]]
+        return episode[:, 0], episode[:, 1]
+
+    def starts(self, indices):
+        """
+        :param indices: episode indices, of shape (N,)
+        :return: the index of the first token of each episode, of shape (N,)
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if self.packed is None:
+            return self.offsets[indices]
+        block = indices // OFFSET_STRIDE
+        first = block * OFFSET_STRIDE
+        before = first[:, None] + np.arange(OFFSET_STRIDE)
+        lengths = np.where(before < indices[:, None], self._lengths[np.minimum(before, max(len(self) - 1, 0))], 0)
+        return self.offsets[block] + lengths.sum(axis=1, dtype=np.int64)
+
+    def episodes(self, indices):
+        """
+        read a batch of episodes at once.
+        :param indices: episode indices, of shape (N,)
+        :return: obs, target and mask arrays of shape (N, T) as returned by generate_dataset(), T being the longest
+                 length of the episodes
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError("episode index out of range")
+        lengths = self.lengths[indices].astype(np.int64)
+        mask = np.arange(lengths.max(initial=0)) < lengths[:, None]
+        obs, target = self._read(self.starts(indices), mask.shape[1])
+        return np.where(mask, obs, 0), np.where(mask, target, 0), mask.astype(np.int64)
+
+    def windows(self, starts, length):
+        """
+        read a batch of windows of the tokens, the episodes being concatenated in order.
+        :param starts: the index of the first token of each window, of shape (N,)
+        :param length: the number of tokens of a window
+        :return: the obs and target indices of shape (N, length)
+        """
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1)
+        if len(starts) and (starts.min() < 0 or starts.max() + length > self.n_tokens):
+            raise IndexError("window out of the %d tokens of the corpus" % self.n_tokens)
+        return self._read(starts, length)
+
+    def _read(self, starts, length):
+        # the windows of windows(), without bounds check: the tokens past the end of the corpus are undefined
+        if not len(starts) or not length or not self.n_tokens:
+            empty = np.zeros((len(starts), length), dtype=self.dtype)
+            return empty, empty.copy()
+        if self.packed is None:
+            tokens = self.tokens[np.minimum(starts[:, None] + np.arange(length), self.n_tokens - 1)]
+            return tokens[..., 0], tokens[..., 1]
+        return _unpack_windows(self.packed, starts, length, self.packed_bits, self.dtype)
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets) if self.packed is None else self._lengths
+
+    def make_env(self, indices=None):
+        """
+        build the env of the corpus, replaying its episodes.
+        :param indices: the indices of the episodes to replay in order, default all of them
+        """
+        env = make_task(self.env_id, **self.kwargs)
+        env.replay(self, indices)
+        env.reset()
+        return env
@@ -1,13 +1,39 @@
+"""
+The env classes are imported on first access, e.g. by gym.make or `from gym_cog_ml_tasks.envs import AX_12_ENV`,
+so importing the package does not import the modules of all the envs.
+"""
 
-from gym_cog_ml_tasks.envs.ax_tasks.ax_12_env import AX_12_ENV
-from gym_cog_ml_tasks.envs.ax_tasks.ax_cpt_env import AX_CPT_ENV
-from gym_cog_ml_tasks.envs.ax_tasks.ax_s_12_env import AX_S_12_ENV
-from gym_cog_ml_tasks.envs.ax_tasks.ax_12_cpt_env import AX_12_CPT_ENV
-from gym_cog_ml_tasks.envs.task_seq_prediction.seq_prediction_env import seq_prediction_ENV
+import importlib
 
-from gym_cog_ml_tasks.envs.copy_tasks.simple_copy_env import Simple_Copy_ENV
-from gym_cog_ml_tasks.envs.copy_tasks.simple_copy_v1_env import Simple_Copy_v1_ENV
-from gym_cog_ml_tasks.envs.copy_tasks.copy_repeat_env import Copy_Repeat_ENV
-from gym_cog_ml_tasks.envs.copy_tasks.copy_repeat_v1_env import Copy_Repeat_v1_ENV
+# the module of each env class
+_ENV_MODULES = {
+    "AX_12_ENV": "gym_cog_ml_tasks.envs.ax_tasks.ax_12_env",
+    "AX_CPT_ENV": "gym_cog_ml_tasks.envs.ax_tasks.ax_cpt_env",
+    "AX_S_12_ENV": "gym_cog_ml_tasks.envs.ax_tasks.ax_s_12_env",
+    "AX_12_CPT_ENV": "gym_cog_ml_tasks.envs.ax_tasks.ax_12_cpt_env",
+    "AX_Vector_ENV": "gym_cog_ml_tasks.envs.ax_tasks.ax_vector_env",
+    "AX_Shared_Vector_ENV": "gym_cog_ml_tasks.envs.ax_tasks.ax_shared_vector_env",
+    "seq_prediction_ENV": "gym_cog_ml_tasks.envs.task_seq_prediction.seq_prediction_env",
 
-from gym_cog_ml_tasks.envs.saccade_task.saccade_env import Saccade_ENV
\ No newline at end of file
+    "Simple_Copy_ENV": "gym_cog_ml_tasks.envs.copy_tasks.simple_copy_env",
+    "Simple_Copy_v1_ENV": "gym_cog_ml_tasks.envs.copy_tasks.simple_copy_v1_env",
+    "Copy_Repeat_ENV": "gym_cog_ml_tasks.envs.copy_tasks.copy_repeat_env",
+    "Copy_Repeat_v1_ENV": "gym_cog_ml_tasks.envs.copy_tasks.copy_repeat_v1_env",
+
+    "Saccade_ENV": "gym_cog_ml_tasks.envs.saccade_task.saccade_env",
+}
+
+__all__ = list(_ENV_MODULES)
+
+
+def __getattr__(name):
+    if name not in _ENV_MODULES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    cls = getattr(importlib.import_module(_ENV_MODULES[name]), name)
+    # cached, so the next accesses don't go through __getattr__
+    globals()[name] = cls
+    return cls
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
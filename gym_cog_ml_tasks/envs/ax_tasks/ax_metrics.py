@@ -0,0 +1,126 @@
+"""
+AX METRICS:
+
+Online accuracy of the AX family tasks split by condition, in constant memory. Each step of an episode has a
+condition code, computed once per episode from its obs indices by reset():
+- digit: a step showing a context digit
+- cue: the first char of a pair (A, B, C)
+- target: the second char of a pair requiring 'R', e.g. AX under '1'
+- lure: the second char of a pair close to a target one requiring 'L', e.g. AX under '2' or BY under '1'
+  in the 12 AX tasks, AY or BX in AX CPT
+- distractor: the second char of the other pairs
+
+e.g.
+metrics = env.track_metrics()
+...
+metrics.snapshot()  # {'target': {'n': 1200, 'correct': 1100, 'accuracy': 0.916}, ...}
+
+DATE: 10.2026
+"""
+
+import numpy as np
+
+CONDITIONS = ('digit', 'cue', 'target', 'lure', 'distractor')
+DIGIT, CUE, TARGET, LURE, DISTRACTOR = range(len(CONDITIONS))
+
+
+class AXMetrics(object):
+
+    def __init__(self):
+        self.n = [0] * len(CONDITIONS)
+        self.correct = [0] * len(CONDITIONS)
+
+    def update(self, code, correct):
+        self.n[code] += 1
+        self.correct[code] += correct
+
+    def update_batch(self, codes, correct):
+        """
+        :param codes: the condition codes of many steps
+        :param correct: whether the action of each step is the target one, same shape as codes
+        """
+        codes = np.asarray(codes).ravel()
+        n = np.bincount(codes, minlength=len(CONDITIONS))
+        c = np.bincount(codes, weights=np.asarray(correct).ravel(), minlength=len(CONDITIONS))
+        self.n = [a + int(b) for a, b in zip(self.n, n)]
+        self.correct = [a + int(b) for a, b in zip(self.correct, c)]
+
+    def merge(self, other):
+        self.n = [a + b for a, b in zip(self.n, other.n)]
+        self.correct = [a + b for a, b in zip(self.correct, other.correct)]
+        return self
+
+    def clear(self):
+        self.__init__()
+
+    def snapshot(self):
+        """
+        :return: {condition: {'n', 'correct', 'accuracy'}}, accuracy being None for the conditions not seen yet
+        """
+        return {name: {'n': n, 'correct': c, 'accuracy': c / n if n else None}
+                for name, n, c in zip(CONDITIONS, self.n, self.correct)}
+
+
+def condition_table(char_sets, targets, lures):
+    """
+    :param char_sets: the pairs, e.g. ['AX', 'AY', ...]
+    :param targets: the target pairs of each context, e.g. [['AX'], ['BY']] for the digits '1' and '2'
+    :param lures: the lure pairs of each context, e.g. [['BY'], ['AX']]
+    :return: the condition codes of the second char of each pair, of shape (n_contexts, n_sets)
+    """
+    table = np.full((len(targets), len(char_sets)), DISTRACTOR, dtype=np.int64)
+    for ctx, (ctx_targets, ctx_lures) in enumerate(zip(targets, lures)):
+        for s in ctx_lures:
+            table[ctx, char_sets.index(s)] = LURE
+        for s in ctx_targets:
+            table[ctx, char_sets.index(s)] = TARGET
+    return table
+
+
+def condition_codes(obs, table, n_digits, n_cues, n_probes):
+    """
+    the condition codes of the steps of an episode, the obs indices being the digits, then the cues, then the probes.
+    :param obs: the obs indices of the episode
+    :param table: the condition table of the env, see condition_table
+    :return: an int array of the shape of obs
+    """
+    obs = np.asarray(obs)
+    is_digit = obs < n_digits
+    codes = np.where(is_digit, DIGIT, CUE)
+    # the last digit shown before each step, the first context when there is none
+    last = np.where(is_digit, np.arange(len(obs)), -1)
+    np.maximum.accumulate(last, out=last)
+    ctx = np.where(last >= 0, obs[np.maximum(last, 0)], 0)
+
+    probes = np.flatnonzero(obs >= n_digits + n_cues)
+    pairs = (obs[probes - 1] - n_digits) * n_probes + obs[probes] - n_digits - n_cues
+    codes[probes] = table[ctx[probes], pairs]
+    return codes
+
+
+def episode_conditions(env):
+    # the codes of the current episode, None before the first reset
+    if env.fast and env._obs_seq is not None:
+        obs = env._obs_seq
+    elif not env.fast and env._input_str is not None:
+        obs = env._from_str(env._input_str, env.idx_2_char)
+    else:
+        return None
+    n_digits = len(getattr(env, 'DIGITS', ()))
+    return condition_codes(obs, env._condition_table, n_digits, len(env.CHAR_1), len(env.CHAR_2)).tolist()
+
+
+def track_metrics(env, metrics=None):
+    """
+    count the correct actions of the steps of env per condition from now on. reset() and step() of the env update
+    env.metrics while it is set, setting it back to None stops the tracking; nothing is wrapped on the instance, so
+    tracking composes with gym_cog_ml_tasks.instrument in any order.
+    :param env: an AX env with a _condition_table
+    :param metrics: the AXMetrics to update, e.g. one shared by several envs, default a new one
+    :return: the AXMetrics, also set as env.metrics
+    """
+    if metrics is None:
+        metrics = AXMetrics()
+    env.metrics = metrics
+    env._condition_seq = episode_conditions(env)
+    return metrics
@@ -0,0 +1,252 @@
+"""
+AX SHARED VECTOR ENV:
+
+Steps N independent episodes of one AX family task over several worker processes, like AX_Vector_ENV.
+Each worker owns a contiguous slice of the lanes and steps them with an AX_Vector_ENV, whose step buffers are views of
+multiprocessing.shared_memory arrays: the actions, obs, reward, done and target_act of all the lanes. A step writes
+the actions, then the main process and the workers meet at a barrier, the workers step their lanes in place, and
+meet again at a second barrier; nothing is pickled along the way.
+
+The lanes of worker k draw from their own generator, seeded by seed(s) with the k-th child of SeedSequence(s),
+so the episodes depend on the seed and on the number of workers. Call close() to stop the workers and free the
+shared memory, which is otherwise done when the env is garbage collected or at exit.
+
+DATE: 10.2026
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+import sys
+import threading
+import traceback
+import weakref
+
+from gym import Env
+from gym.spaces import Box, MultiDiscrete
+import numpy as np
+
+from gym_cog_ml_tasks.envs.ax_tasks.ax_12_env import AX_12_ENV
+from gym_cog_ml_tasks.envs.ax_tasks.ax_vector_env import AX_Vector_ENV
+
+# the commands sent to the workers
+COMMANDS = ("step", "reset", "seed", "close")
+STEP, RESET, SEED, CLOSE = range(len(COMMANDS))
+
+
+def _attach(spec):
+    # the shared memory block and the array of a spec (name, shape, dtype)
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker(k, lo, hi, task, kwargs, specs, barrier, errors):
+    blocks, arrays = {}, {}
+    for key, spec in specs.items():
+        blocks[key], arrays[key] = _attach(spec)
+    command, actions = arrays["command"], arrays["actions"]
+    try:
+        env = AX_Vector_ENV(task, num_envs=hi - lo, copy=False, defer_reset=True, **kwargs)
+        # the step buffers of the lanes of this worker are their slices of the shared arrays
+        env._obs_buf = arrays["obs"][lo:hi]
+        env._reward_buf = arrays["reward"][lo:hi]
+        env._done_buf = arrays["done"][lo:hi]
+        env._target_buf = arrays["target"][lo:hi]
+        if env._one_hot_buf is not None:
+            env._one_hot_buf = arrays["one_hot"][lo:hi]
+    except Exception:
+        # keep answering the commands, so the failure is reported by the next one instead of a timeout
+        env = None
+        sys.stderr.write("worker %d:\n%s" % (k, traceback.format_exc()))
+    try:
+        while True:
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                # the main process gave up on the workers, see _shutdown
+                break
+            cmd = command[0]
+            if cmd == CLOSE:
+                break
+            try:
+                if env is None:
+                    raise RuntimeError("the lanes of worker %d could not be built" % k)
+                if cmd == STEP:
+                    env.step(actions[lo:hi])
+                elif cmd == RESET:
+                    env.reset()
+                elif cmd == SEED:
+                    env.seed(int(arrays["seeds"][k]) if command[1] else None)
+            except Exception:
+                errors[k] = 1
+                sys.stderr.write("worker %d:\n%s" % (k, traceback.format_exc()))
+            barrier.wait()
+    finally:
+        del command, actions, arrays, env
+        for shm in blocks.values():
+            shm.close()
+
+
+def _shutdown(blocks, workers, barrier, timeout):
+    # stop the workers and free the shared memory, by close() or when the env is garbage collected
+    command = np.ndarray((2,), dtype=np.int64, buffer=blocks["command"].buf)
+    command[0] = CLOSE
+    del command
+    if all(p.is_alive() for p in workers):
+        try:
+            barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            pass
+    else:
+        # a dead worker would never meet the others at the barrier
+        barrier.abort()
+    for p in workers:
+        p.join(timeout)
+        if p.is_alive():
+            p.terminate()
+    for shm in blocks.values():
+        try:
+            shm.close()
+        except BufferError:
+            # an array returned with copy=False still views the block, which is freed along with it
+            pass
+        shm.unlink()
+
+
+class AX_Shared_Vector_ENV(Env):
+
+    def __init__(self, task=AX_12_ENV, num_envs=64, num_workers=None, copy=True, defer_reset=False,
+                 start_method=None, timeout=60.0, **kwargs):
+        """
+        :param task: the AX env class to vectorize, e.g. AX_12_ENV, AX_S_12_ENV, AX_CPT_ENV or AX_12_CPT_ENV
+        :param num_envs: the number of lanes N
+        :param num_workers: the number of worker processes, default os.cpu_count(), at most N
+        :param copy: return copies of the shared buffers, otherwise views overwritten by the next step
+        :param defer_reset: don't generate the episodes here, the first ones are generated by the first reset()
+        :param start_method: the multiprocessing start method of the workers, default the platform one
+        :param timeout: the seconds to wait for the workers at each barrier before failing, None to wait forever
+        :param kwargs: the params of the task, e.g. size, prob_target
+        """
+        # the scalar env holds the spaces of the task
+        self.task = task(defer_reset=True, **kwargs)
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers or multiprocessing.cpu_count(), num_envs)
+        self.copy = copy
+        self.timeout = timeout
+
+        self.single_observation_space = self.task.observation_space
+        self.single_action_space = self.task.action_space
+        if self.task.one_hot:
+            self.observation_space = Box(0.0, 1.0, (num_envs, self.task.n_obs), dtype=np.float32)
+        else:
+            self.observation_space = MultiDiscrete([self.single_observation_space.n] * num_envs)
+        self.action_space = MultiDiscrete([self.single_action_space.n] * num_envs)
+
+        # command: [command, whether seeds are given], seeds: the seed of each worker
+        layout = {
+            "command": ((2,), np.int64),
+            "seeds": ((self.num_workers,), np.int64),
+            "actions": ((num_envs,), np.int64),
+            "obs": ((num_envs,), np.int64),
+            "reward": ((num_envs,), np.float64),
+            "done": ((num_envs,), np.bool_),
+            "target": ((num_envs,), np.int64),
+        }
+        if self.task.one_hot:
+            layout["one_hot"] = ((num_envs, self.task.n_obs), np.float32)
+        self._blocks, self._arrays, specs = {}, {}, {}
+        for key, (shape, dtype) in layout.items():
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks[key] = shm
+            self._arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            self._arrays[key][...] = 0
+            specs[key] = (shm.name, shape, np.dtype(dtype).str)
+
+        ctx = multiprocessing.get_context(start_method)
+        self._barrier = ctx.Barrier(self.num_workers + 1)
+        self._errors = ctx.RawArray('b', self.num_workers)
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        self.lanes = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        self._workers = []
+        # the workers are added as they are started
+        self._finalizer = weakref.finalize(self, _shutdown, self._blocks, self._workers, self._barrier, timeout)
+        for k, (lo, hi) in enumerate(self.lanes):
+            p = ctx.Process(target=_worker, args=(k, lo, hi, task, kwargs, specs, self._barrier, self._errors),
+                            name="ax_shared_vector_%d" % k, daemon=True)
+            p.start()
+            self._workers.append(p)
+        self.closed = False
+
+        if not defer_reset:
+            self.reset()
+
+    def seed(self, seed=None):
+        """
+        :param seed: the master seed, worker k seeding its lanes with the k-th child of SeedSequence(seed)
+        """
+        if seed is not None:
+            children = np.random.SeedSequence(seed).spawn(self.num_workers)
+            self._arrays["seeds"][:] = [child.generate_state(1)[0] for child in children]
+        self._run(SEED, seed is not None)
+        return [seed]
+
+    def reset(self):
+        self._run(RESET)
+        return self._outputs()[0]
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        assert actions.shape == (self.num_envs,)
+        self._arrays["actions"][:] = actions
+        self._run(STEP)
+        return self._outputs()
+
+    def render(self, mode='human'):
+        """
+        :param mode: 'human' writes the state of the lanes to stdout, 'ansi' returns it as a string
+        """
+        if mode not in ('human', 'ansi'):
+            raise NotImplementedError("render mode %r is not supported, use 'human' or 'ansi'" % mode)
+        out = "=" * 20 + "\n"
+        out += "Lanes    : %d over %d workers\n" % (self.num_envs, self.num_workers)
+        reward, done = self._arrays["reward"], self._arrays["done"]
+        for i in range(self.num_envs):
+            out += "Lane %d: last reward %.2f%s\n" % (i, reward[i], ", new episode" if done[i] else "")
+        out += "\n"
+        if mode == 'ansi':
+            return out
+        sys.stdout.write(out)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._arrays = {}
+        self._finalizer()
+
+    def _run(self, cmd, has_seed=False):
+        if self.closed:
+            raise RuntimeError("the env is closed")
+        dead = [k for k, p in enumerate(self._workers) if not p.is_alive()]
+        if dead:
+            raise RuntimeError("the workers %s are dead, see their exit codes %s" % (
+                dead, [self._workers[k].exitcode for k in dead]))
+        self._arrays["command"][:] = (cmd, has_seed)
+        try:
+            self._barrier.wait(self.timeout)
+            self._barrier.wait(self.timeout)
+        except threading.BrokenBarrierError:
+            raise RuntimeError("a worker did not answer within %s seconds" % self.timeout)
+        failed = [k for k in range(self.num_workers) if self._errors[k]]
+        if failed:
+            for k in failed:
+                self._errors[k] = 0
+            raise RuntimeError("%s failed in the workers %s, see their traceback above" % (COMMANDS[cmd], failed))
+
+    def _outputs(self):
+        a = self._arrays
+        obs = a["one_hot"] if self.task.one_hot else a["obs"]
+        if self.copy:
+            return obs.copy(), a["reward"].copy(), a["done"].copy(), {"target_act": a["target"].copy()}
+        return obs, a["reward"], a["done"], {"target_act": a["target"]}
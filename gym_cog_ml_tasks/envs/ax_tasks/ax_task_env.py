@@ -0,0 +1,321 @@
+"""
+AX TASK ENGINE:
+
+The AX family tasks share this engine, a task being declared as data by a subclass:
+- the vocabulary: DIGITS (the context digits, possibly none), CHAR_1 (the cues) and CHAR_2 (the probes);
+- the pair distribution: every cue-probe pair is a set, and with DIGIT_SETS the digits are sets too.
+  The target pairs share prob_target, the digit sets share prob_12, and the other pairs share the rest;
+- the context-update table: a digit stores itself as the context, a pair keeps the stored one;
+- the response table: TARGETS[c] are the pairs answered 'R' on their probe under the context c,
+  every other step is answered 'L'.
+An episode starts with a digit when the task has digits, then sets are drawn until it is min_length long.
+Generation and targets are table lookups over all the episodes at once, see _generate_batch, so a new variant
+needs no new code, e.g. a 3-digit context:
+
+class AX_123_ENV(AX_12_ENV):
+    DIGITS = ['1', '2', '3']
+    TARGETS = [['AX'], ['BY'], ['CZ']]
+    LURES = [['BY', 'CZ'], ['AX', 'CZ'], ['AX', 'BY']]
+
+DATE: 10.2026
+"""
+
+from gym.spaces import Discrete
+from gym.utils import colorize, seeding
+import numpy as np
+import sys
+
+from gym_cog_ml_tasks.envs.ax_tasks.ax_metrics import condition_table, episode_conditions, track_metrics
+from gym_cog_ml_tasks.envs.task_env import SeqTaskEnv
+
+
+class AXTaskEnv(SeqTaskEnv):
+
+    DIGITS = []
+    CHAR_1 = []
+    CHAR_2 = []
+    ACTIONS = ['L', 'R']
+    # the target pairs of each context: one entry per digit, or a single one when the task has no digit
+    TARGETS = []
+    # the lure pairs of each context, see ax_metrics
+    LURES = []
+    # whether the digits are drawn among the sets, changing the context within an episode
+    DIGIT_SETS = False
+    # the AXMetrics updated by step() when set, see track_metrics()
+    metrics = None
+    _condition_seq = None
+
+    def __init__(self, prob_target, prob_12=0.0, fast=False, one_hot=False, defer_reset=False, async_reset=False):
+        """
+        the params shared by the AX tasks, a subclass sets its size before calling this constructor.
+        :param prob_target: the probability to draw a target pair, split evenly between the target pairs
+        :param prob_12: the probability to draw a digit, split evenly between the digits, with DIGIT_SETS
+        :param fast: keep the episode as integer arrays for a faster step(), see SeqTaskEnv
+        :param one_hot: observe float32 one-hot vectors instead of indices, see SeqTaskEnv
+        :param defer_reset: don't generate an episode here, the first one is generated by the first reset()
+        :param async_reset: generate the next episode in a worker thread after each reset(), see TaskEnv; implies fast
+        """
+        # observation (characters)
+        self.idx_2_char = self.DIGITS + self.CHAR_1 + self.CHAR_2
+        self.char_2_idx = {}
+        for i, c in enumerate(self.idx_2_char):
+            self.char_2_idx[c] = i
+        self.observation_space = Discrete(len(self.idx_2_char))
+
+        # action
+        self.action_space = Discrete(len(self.ACTIONS))
+
+        self.prob_target = prob_target
+        self.prob_12 = prob_12
+
+        # states of an episode
+        self.position = None
+        self.last_action = None
+        self.last_reward = None
+        self.episode_total_reward = None
+        self.input_str = None
+        self.target_str = None
+        self.output_str = None
+
+        # cached generating tables, see char_sets, probs and _tables
+        self._char_sets = None
+        self._probs = None
+        self._probs_key = None
+        self._tables_cache = None
+
+        self.fast = fast or one_hot or async_reset
+        self.async_reset = async_reset
+        if one_hot:
+            self._set_one_hot()
+
+        self.np_random = None
+        self.seed()
+        if not defer_reset:
+            self.reset()
+
+    @property
+    def min_length(self):
+        # the number of steps an episode reaches at least, from the size param of the task
+        raise NotImplementedError
+
+    @property
+    def char_sets(self):
+        if self._char_sets is None:
+            sets = []
+            for c1 in self.CHAR_1:
+                for c2 in self.CHAR_2:
+                    sets.append(c1 + c2)
+            if self.DIGIT_SETS:
+                sets += self.DIGITS
+            self._char_sets = sets
+        return self._char_sets
+
+    @property
+    def probs(self):
+        # rebuilt only when prob_target or prob_12 is changed
+        key = (self.prob_target, self.prob_12)
+        if self._probs_key != key:
+            sets = self.char_sets
+            targets = sorted(set(s for ctx_targets in self.TARGETS for s in ctx_targets))
+            digits = self.DIGITS if self.DIGIT_SETS else []
+            prob_12 = self.prob_12 if self.DIGIT_SETS else 0
+            prob_other = (1 - self.prob_target - prob_12) / (len(sets) - len(targets) - len(digits))
+            p = np.full(len(sets), prob_other)
+            for s in targets:
+                p[sets.index(s)] = self.prob_target / len(targets)
+            for d in digits:
+                p[sets.index(d)] = prob_12 / len(digits)
+            self._probs, self._probs_key = p, key
+        return self._probs
+
+    @property
+    def _tables(self):
+        """
+        lookup tables indexed by the char set index, used to emit the episodes without per-element branches:
+        digit_idx: the obs index of each digit
+        first, second: the obs index of the first and the last char of each set
+        n_chars: the number of chars of each set
+        set_digit: the context stored by each set, -1 for pairs which keep the last stored one
+        response: the action on the last char of each set, given the context
+        """
+        if self._tables_cache is None:
+            sets = self.char_sets
+            L, R = self.ACTIONS.index('L'), self.ACTIONS.index('R')
+            response = np.full((len(self.TARGETS), len(sets)), L, dtype=np.int64)
+            for ctx, ctx_targets in enumerate(self.TARGETS):
+                for s in ctx_targets:
+                    response[ctx, sets.index(s)] = R
+            self._tables_cache = {
+                "digit_idx": np.array([self.char_2_idx[d] for d in self.DIGITS], dtype=np.int64),
+                "first": np.array([self.char_2_idx[s[0]] for s in sets]),
+                "second": np.array([self.char_2_idx[s[-1]] for s in sets]),
+                "n_chars": np.array([len(s) for s in sets]),
+                "set_digit": np.array([self.DIGITS.index(s) if s in self.DIGITS else -1 for s in sets]),
+                "response": response,
+            }
+        return self._tables_cache
+
+    @property
+    def _condition_table(self):
+        return condition_table(self.char_sets, self.TARGETS, self.LURES)
+
+    @property
+    def input_length(self):
+        return len(self.input_str)
+
+    def track_metrics(self, metrics=None):
+        """
+        count the correct actions of step() per condition (target, lure, ...) from now on, see ax_metrics.
+        :param metrics: the AXMetrics to update, default a new one
+        :return: the AXMetrics, also set as self.metrics
+        """
+        return track_metrics(self, metrics)
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def reset(self, episode_index=None):
+        self._episode_index = episode_index
+        if self.fast:
+            obs_idx = self._reset_fast()
+        else:
+            self.position = 0
+            self.last_action = None
+            self.last_reward = None
+            self.episode_total_reward = 0.0
+            self.input_str, self.target_str = self._new_episode()
+            self.output_str = ''
+            obs_char, obs_idx = self._get_observation()
+        if self.metrics is not None:
+            self._condition_seq = episode_conditions(self)
+        return obs_idx
+
+    def step(self, action):
+        if self.metrics is not None:
+            return self._step_tracked(action)
+        if self.fast:
+            return self._step_fast(action)
+        return self._step_str(action)
+
+    def _step_tracked(self, action):
+        # step() counting the correct actions of each condition in self.metrics
+        code = self._condition_seq[self.position]
+        result = self._step_fast(action) if self.fast else self._step_str(action)
+        self.metrics.update(code, action == result[3]['target_act'])
+        return result
+
+    def _step_str(self, action):
+        assert self.action_space.contains(action)
+        assert 0 <= self.position < self.input_length
+        target_act = self.ACTIONS.index(self.target_str[self.position])
+        reward = 1.0 if action == target_act else -1.0
+        self.last_action = action
+        self.last_reward = reward
+        self.episode_total_reward += reward
+        self.output_str += self.ACTIONS[action]
+        self.position += 1
+        if self.position < self.input_length:
+            done = False
+            _, obs = self._get_observation()
+        else:
+            done = True
+            obs = None
+        info = {"target_act": target_act}
+        return obs, reward, done, info
+
+    def render(self, mode='human'):
+        outfile = sys.stdout  #TODO: other mode
+        pos = self.position - 1
+        o_str = ""
+        if pos > -1:
+            for i, c in enumerate(self.output_str):
+                color = 'green' if self.target_str[i] == c else 'red'
+                o_str += colorize(c, color, highlight=True)
+        outfile.write("="*20 + "\n")
+        outfile.write("Length   : " + str(self.input_length) + "\n")
+        outfile.write("Input    : " + self.input_str + "\n")
+        outfile.write("Target   : " + self.target_str + "\n")
+        outfile.write("Output   : " + o_str + "\n")
+        if self.position > 0:
+            outfile.write("-" * 20 + "\n")
+            outfile.write("Current reward:   %.2f\n" % self.last_reward)
+            outfile.write("Cumulative reward:   %.2f\n" % self.episode_total_reward)
+        outfile.write("\n")
+        return
+
+    def _generate_input_target(self):
+        obs, target, lengths = self._generate_batch(1)
+        length = lengths[0]
+        input_str = self._to_str(obs[0, :length], self.idx_2_char)
+        target_str = self._to_str(target[0, :length], self.ACTIONS)
+        return input_str, target_str
+
+    def _generate_batch(self, n_episodes, rng=None):
+        """
+        draw n_episodes at once through the tables of the task.
+        :param n_episodes: the number of episodes to generate
+        :param rng: the random generator to draw from, default self.np_random
+        :return: obs and target index matrices of shape (n_episodes, T), and episode lengths of shape (n_episodes,)
+        """
+        if rng is None:
+            rng = self.np_random
+        tables = self._tables
+        digit_idx, first, second = tables["digit_idx"], tables["first"], tables["second"]
+        n_chars, set_digit, response = tables["n_chars"], tables["set_digit"], tables["response"]
+        L = self.ACTIONS.index('L')
+        min_length = self.min_length
+
+        # all the sets are drawn in one call, enough of them to reach min_length even with the shortest sets;
+        # the ones beyond it are dropped
+        n_first = 1 if self.DIGITS else 0
+        first_digits = rng.choice(len(self.DIGITS), size=n_episodes) if n_first else np.zeros(n_episodes, np.int64)
+        n_draws = max(int(np.ceil((min_length - n_first) / n_chars.min())), 0)
+        draws = rng.choice(len(n_chars), size=(n_episodes, n_draws), p=self.probs)
+
+        if not self.DIGIT_SETS:
+            # only pairs: a fixed layout, and the context is the first digit
+            length = n_first + 2 * n_draws
+            obs = np.empty((n_episodes, length), dtype=np.int64)
+            target = np.full((n_episodes, length), L, dtype=np.int64)
+            if n_first:
+                obs[:, 0] = digit_idx[first_digits]
+            obs[:, n_first::2] = first[draws]
+            obs[:, n_first + 1::2] = second[draws]
+            target[:, n_first + 1::2] = response[first_digits[:, None], draws]
+            return obs, target, np.full(n_episodes, length, dtype=np.int64)
+
+        draw_chars = n_chars[draws]
+        starts = n_first + np.cumsum(draw_chars, axis=1) - draw_chars
+        used = starts < min_length
+        lengths = n_first + (draw_chars * used).sum(axis=1)
+
+        # forward-fill the last stored digit over the draws
+        ctx = np.concatenate([first_digits[:, None], set_digit[draws]], axis=1)
+        last = np.where(ctx >= 0, np.arange(n_draws + 1), 0)
+        np.maximum.accumulate(last, axis=1, out=last)
+        ctx = np.take_along_axis(ctx, last, axis=1)[:, 1:]
+
+        width = int(lengths.max()) if n_episodes > 0 else 1
+        obs = np.zeros((n_episodes, width), dtype=np.int64)
+        target = np.full((n_episodes, width), L, dtype=np.int64)
+        if n_first:
+            obs[:, 0] = digit_idx[first_digits]
+        rows, cols = np.nonzero(used)
+        s, pos = draws[rows, cols], starts[rows, cols]
+        obs[rows, pos] = first[s]
+        is_pair = n_chars[s] == 2
+        rows, cols, s, pos = rows[is_pair], cols[is_pair], s[is_pair], pos[is_pair]
+        obs[rows, pos + 1] = second[s]
+        target[rows, pos + 1] = response[ctx[rows, cols], s]
+        return obs, target, lengths
+
+    def _decode_episode(self, obs, target):
+        return self._to_str(obs, self.idx_2_char), self._to_str(target, self.ACTIONS)
+
+    def _get_observation(self, pos=None):
+        if pos is None:
+            pos = self.position
+        obs_char = self.input_str[pos]
+        obs_idx = self.char_2_idx[obs_char]
+        return obs_char, obs_idx
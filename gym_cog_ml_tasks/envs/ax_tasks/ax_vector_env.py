@@ -0,0 +1,166 @@
+"""
+AX VECTOR ENV:
+
+Steps N independent episodes of one AX family task (12_AX, 12_AX_S, AX_CPT, 12_AX_CPT) at once.
+The episodes are kept as padded integer matrices, so a step is a few array operations over all the lanes:
+- actions: int array of shape (N,)
+- obs, reward, done and info["target_act"]: arrays of shape (N,)
+
+A lane is reset automatically when its episode ends, the returned obs of that lane is then the first
+observation of the new episode.
+
+With one_hot=True in the task params, obs is a float32 (N, n_obs) matrix of one-hot rows, updated in place
+at each step.
+
+DATE: 10.2026
+"""
+
+from gym import Env
+from gym.spaces import Box, MultiDiscrete
+import numpy as np
+import sys
+
+from gym_cog_ml_tasks.envs.ax_tasks.ax_12_env import AX_12_ENV
+from gym_cog_ml_tasks.instrument import instrument, uninstrument
+
+
+class AX_Vector_ENV(Env):
+
+    def __init__(self, task=AX_12_ENV, num_envs=64, copy=True, defer_reset=False, **kwargs):
+        """
+        :param task: the AX env class to vectorize, e.g. AX_12_ENV, AX_S_12_ENV, AX_CPT_ENV or AX_12_CPT_ENV
+        :param num_envs: the number of lanes N
+        :param copy: return copies of the step buffers, otherwise the same arrays are reused and overwritten by the next step
+        :param defer_reset: don't generate the episodes here, the first ones are generated by the first reset()
+        :param kwargs: the params of the task, e.g. size, prob_target
+        """
+        # the scalar env holds the vocabulary and the generating rules of the task, its own episode is never used
+        self.task = task(defer_reset=True, **kwargs)
+        self.num_envs = num_envs
+        self.copy = copy
+
+        self.single_observation_space = self.task.observation_space
+        self.single_action_space = self.task.action_space
+        if self.task.one_hot:
+            self.observation_space = Box(0.0, 1.0, (num_envs, self.task.n_obs), dtype=np.float32)
+        else:
+            self.observation_space = MultiDiscrete([self.single_observation_space.n] * num_envs)
+        self.action_space = MultiDiscrete([self.single_action_space.n] * num_envs)
+
+        # states of the lanes
+        self.obs_mat = None
+        self.target_mat = None
+        self.lengths = None
+        self.position = None
+        self.episode_total_reward = None
+        self.last_reward = None
+        self._row_start = None
+        self._flat_pos = None
+        self._obs_buf = np.empty(num_envs, dtype=np.int64)
+        self._target_buf = np.empty(num_envs, dtype=np.int64)
+        self._reward_buf = np.empty(num_envs, dtype=np.float64)
+        self._done_buf = np.empty(num_envs, dtype=bool)
+        # the one-hot obs, and the flat indices of their ones
+        self._one_hot_buf = np.zeros((num_envs, self.task.n_obs), dtype=np.float32) if self.task.one_hot else None
+        self._hot_start = np.arange(num_envs, dtype=np.int64) * self.task.n_obs
+        self._hot_pos = self._hot_start.copy()
+        self.stats = None
+
+        if not defer_reset:
+            self.reset()
+
+    @property
+    def width(self):
+        return self.obs_mat.shape[1]
+
+    @property
+    def np_random(self):
+        return self.task.np_random
+
+    def seed(self, seed=None):
+        return self.task.seed(seed)
+
+    def instrument(self, stats=None, callback=None):
+        """
+        time reset, step, render and the generation of the lanes' episodes, see gym_cog_ml_tasks.instrument.
+        :return: the EnvStats, also set as self.stats
+        """
+        return instrument(self, stats, callback)
+
+    def uninstrument(self):
+        uninstrument(self)
+
+    def reset(self):
+        self.obs_mat, self.target_mat, self.lengths = self.task._generate_batch(self.num_envs)
+        self.position = np.zeros(self.num_envs, dtype=np.int64)
+        self.episode_total_reward = np.zeros(self.num_envs)
+        self.last_reward = np.zeros(self.num_envs)
+        self._row_start = np.arange(self.num_envs, dtype=np.int64) * self.width
+        self._flat_pos = self._row_start.copy()
+        return self._observe().copy()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        assert actions.shape == (self.num_envs,)
+        target, reward, done = self._target_buf, self._reward_buf, self._done_buf
+        np.take(self.target_mat, self._flat_pos, out=target)
+        np.equal(actions, target, out=done)
+        np.subtract(np.multiply(done, 2.0, out=reward), 1.0, out=reward)
+        self.last_reward[:] = reward
+        self.episode_total_reward += reward
+
+        self.position += 1
+        self._flat_pos += 1
+        np.greater_equal(self.position, self.lengths, out=done)
+        if done.any():
+            self._reset_lanes(np.flatnonzero(done))
+        obs = self._observe()
+
+        if self.copy:
+            return obs.copy(), reward.copy(), done.copy(), {"target_act": target.copy()}
+        return obs, reward, done, {"target_act": target}
+
+    def render(self, mode='human'):
+        """
+        :param mode: 'human' writes the state of the lanes to stdout, 'ansi' returns it as a string
+        """
+        if mode not in ('human', 'ansi'):
+            raise NotImplementedError("render mode %r is not supported, use 'human' or 'ansi'" % mode)
+        out = "=" * 20 + "\n"
+        out += "Lanes    : " + str(self.num_envs) + "\n"
+        for i in range(self.num_envs):
+            out += ("Lane %d: position %d/%d, cumulative reward %.2f\n"
+                    % (i, self.position[i], self.lengths[i], self.episode_total_reward[i]))
+        out += "\n"
+        if mode == 'ansi':
+            return out
+        sys.stdout.write(out)
+
+    def _observe(self):
+        np.take(self.obs_mat, self._flat_pos, out=self._obs_buf)
+        if self._one_hot_buf is None:
+            return self._obs_buf
+        # move the ones of the previous step to the new obs
+        flat = self._one_hot_buf.reshape(-1)
+        flat[self._hot_pos] = 0.0
+        np.add(self._hot_start, self._obs_buf, out=self._hot_pos)
+        flat[self._hot_pos] = 1.0
+        return self._one_hot_buf
+
+    def _reset_lanes(self, lanes):
+        obs, target, lengths = self.task._generate_batch(len(lanes))
+        if obs.shape[1] > self.width:
+            self._grow(obs.shape[1])
+        self.obs_mat[lanes, :obs.shape[1]] = obs
+        self.target_mat[lanes, :target.shape[1]] = target
+        self.lengths[lanes] = lengths
+        self.position[lanes] = 0
+        self.episode_total_reward[lanes] = 0.0
+        self._flat_pos[lanes] = self._row_start[lanes]
+
+    def _grow(self, width):
+        pad = ((0, 0), (0, width - self.width))
+        self.obs_mat = np.pad(self.obs_mat, pad)
+        self.target_mat = np.pad(self.target_mat, pad)
+        self._row_start = np.arange(self.num_envs, dtype=np.int64) * width
+        self._flat_pos = self._row_start + self.position
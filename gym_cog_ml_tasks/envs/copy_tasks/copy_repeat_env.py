@@ -16,23 +16,28 @@ AUTHOR: Zenggo
 DATE: 04.2020
 """
 
-from gym import Env
 from gym.spaces import Discrete
 from gym.utils import colorize, seeding
-import numpy as np
 import sys
 import string
 
+from gym_cog_ml_tasks.envs.copy_tasks.copy_repeat_task_env import CopyRepeatTaskEnv
 
-class Copy_Repeat_ENV(Env):
+
+class Copy_Repeat_ENV(CopyRepeatTaskEnv):
 
     ALPHABET = list(string.ascii_uppercase[:26])
 
-    def __init__(self, n_char=5, size=6, repeat=3):
+    def __init__(self, n_char=5, size=6, repeat=3, fast=False, one_hot=False, defer_reset=False, async_reset=False, tokens=False):
         """
-        :param n_char: number of different chars in inputs, e.g. 3 => {A,B,C}
+        :param n_char: number of different chars in inputs, e.g. 3 => {A,B,C}, or of tokens beyond 26
         :param size: the length of input sequence
         :param repeat: the expected repeat times of the target output
+        :param fast: keep the episode as integer arrays for a faster step(), see SeqTaskEnv
+        :param one_hot: observe float32 one-hot vectors instead of indices, see SeqTaskEnv
+        :param defer_reset: don't generate an episode here, the first one is generated by the first reset()
+        :param async_reset: generate the next episode in a worker thread after each reset(), see TaskEnv; implies fast
+        :param tokens: keep the episodes as uint8/16/32 token arrays, see SeqTaskEnv; implies fast, set when n_char > 26
         """
         self.n_char = n_char
         self.size = size
@@ -52,9 +57,17 @@ class Copy_Repeat_ENV(Env):
         self.target_str = None
         self.output_str = None
 
+        self.fast = fast or one_hot or async_reset
+        self.async_reset = async_reset
+        if tokens or n_char > len(self.ALPHABET):
+            self._set_tokens(self.ALPHABET)
+        if one_hot:
+            self._set_one_hot()
+
         self.np_random = None
         self.seed()
-        self.reset()
+        if not defer_reset:
+            self.reset()
 
     @property
     def input_length(self):
@@ -68,17 +81,22 @@ class Copy_Repeat_ENV(Env):
         self.np_random, seed = seeding.np_random(seed)
         return [seed]
 
-    def reset(self):
+    def reset(self, episode_index=None):
+        self._episode_index = episode_index
+        if self.fast:
+            return self._reset_fast()
         self.position = 0
         self.last_action = None
         self.last_reward = None
         self.episode_total_reward = 0.0
-        self.input_str, self.target_str = self._generate_input_target()
+        self.input_str, self.target_str = self._new_episode()
         self.output_str = ''
         obs_char, obs_idx = self._get_observation()
         return obs_idx
 
     def step(self, action):
+        if self.fast:
+            return self._step_fast(action)
         assert self.action_space.contains(action)
         assert 0 <= self.position < self.target_length
         target_act = self.ALPHABET.index(self.target_str[self.position])
@@ -131,6 +149,9 @@ class Copy_Repeat_ENV(Env):
                 target_str += input_str
         return input_str, target_str
 
+    def _sample_inputs(self, rng, n_episodes):
+        return rng.choice(self.n_char, size=(n_episodes, self.size))
+
     def _get_observation(self, pos=None):
         if pos is None:
             pos = self.position
@@ -0,0 +1,63 @@
+"""
+The generation shared by the copy-repeat tasks: a subclass draws the inputs with _sample_inputs, and the obs and
+target are built from them, as arrays by _generate_batch or as index views by reset() in fast mode and by
+generate_views, see copy_repeat_views.
+"""
+
+import numpy as np
+
+from gym_cog_ml_tasks.envs.copy_tasks.copy_repeat_views import repeat_index, repeat_views
+from gym_cog_ml_tasks.envs.task_env import SeqTaskEnv
+
+
+class CopyRepeatTaskEnv(SeqTaskEnv):
+
+    def _sample_inputs(self, rng, n_episodes):
+        """
+        :return: the input indices of n_episodes, of shape (n_episodes, size)
+        """
+        raise NotImplementedError
+
+    def _generate_batch(self, n_episodes, rng=None):
+        """
+        :param n_episodes: the number of episodes to generate
+        :param rng: the random generator to draw from, default self.np_random
+        :return: obs and target index matrices of shape (n_episodes, T), and episode lengths of shape (n_episodes,)
+        """
+        return self._repeat_batch(self._generate_inputs(n_episodes, rng))
+
+    def generate_views(self, n_episodes):
+        """
+        generate_dataset() without storing the repeated target: obs and target are index mappings over the inputs,
+        see copy_repeat_views, so the episodes take O(size) memory whatever the repeat.
+        :param n_episodes: the number of episodes N
+        :return: obs and target views of shape (N, T), and the mask of shape (N, T), a read-only array of ones
+        """
+        obs, target = repeat_views(self._generate_inputs(n_episodes), self.repeat, self.n_char)
+        return obs, target, np.broadcast_to(np.int64(1), obs.shape)
+
+    def _generate_inputs(self, n_episodes, rng=None):
+        if rng is None:
+            rng = self.np_random
+        return self._sample_inputs(rng, n_episodes).astype(self.token_dtype, copy=False)
+
+    def _generate_arrays(self, rng):
+        # the episode of reset() in fast mode, as views over its input
+        return repeat_views(self._generate_inputs(1, rng)[0], self.repeat, self.n_char)
+
+    def _repeat_batch(self, inputs):
+        # the obs are the inputs followed by the empty symbol, the target repeats the inputs, reversed every other time
+        n_episodes, size = inputs.shape
+        length = size * self.repeat
+        obs = np.full((n_episodes, length), self.n_char, dtype=self.token_dtype)
+        obs[:, :size] = inputs
+        target = inputs[:, repeat_index(np.arange(length), size)]
+        return obs, target, np.full(n_episodes, length, dtype=np.int64)
+
+    def _decode_episode(self, obs, target):
+        # the obs after the input are the empty symbol
+        obs, target = np.asarray(obs), np.asarray(target)
+        return self._to_str(obs[obs < self.n_char], self.ALPHABET), self._to_str(target, self.ALPHABET)
+
+    def _decode_actions(self, actions):
+        return self._to_str(actions, self.ALPHABET)
@@ -16,23 +16,31 @@ AUTHOR: Zenggo
 DATE: 05.2020
 """
 
-from gym import Env
 from gym.spaces import Discrete
 from gym.utils import colorize, seeding
-import numpy as np
 import sys
 import string
 
+from gym_cog_ml_tasks.envs.copy_tasks.copy_repeat_task_env import CopyRepeatTaskEnv
+from gym_cog_ml_tasks.envs.copy_tasks.copy_sampling import sample_inputs
 
-class Copy_Repeat_v1_ENV(Env):
+
+class Copy_Repeat_v1_ENV(CopyRepeatTaskEnv):
 
     ALPHABET = list(string.ascii_uppercase[:26])
 
-    def __init__(self, n_char=5, size=6, repeat=3):
+    def __init__(self, n_char=5, size=6, repeat=3, mode='full', n_exclude=1, fast=False, one_hot=False, defer_reset=False, async_reset=False, tokens=False):
         """
-        :param n_char: number of different chars in inputs, e.g. 3 => {A,B,C}
+        :param n_char: number of different chars in inputs, e.g. 3 => {A,B,C}, or of tokens beyond 26
         :param size: the length of input sequence
         :param repeat: the expected repeat times of the target output
+        :param mode: the generating mode, 'full', 'major' or 'minor', see setMode
+        :param n_exclude: the number of chars excluded at each position in 'major' mode
+        :param fast: keep the episode as integer arrays for a faster step(), see SeqTaskEnv
+        :param one_hot: observe float32 one-hot vectors instead of indices, see SeqTaskEnv
+        :param defer_reset: don't generate an episode here, the first one is generated by the first reset()
+        :param async_reset: generate the next episode in a worker thread after each reset(), see TaskEnv; implies fast
+        :param tokens: keep the episodes as uint8/16/32 token arrays, see SeqTaskEnv; implies fast, set when n_char > 26
         """
         self.n_char = n_char
         self.size = size
@@ -55,10 +63,19 @@ class Copy_Repeat_v1_ENV(Env):
         # generating mode
         self.mode = 'full'  # full, major, minor
         self.n_exclude = 1
+        self.setMode(mode, n_exclude)
+
+        self.fast = fast or one_hot or async_reset
+        self.async_reset = async_reset
+        if tokens or n_char > len(self.ALPHABET):
+            self._set_tokens(self.ALPHABET)
+        if one_hot:
+            self._set_one_hot()
 
         self.np_random = None
         self.seed()
-        self.reset()
+        if not defer_reset:
+            self.reset()
 
     @property
     def input_length(self):
@@ -77,17 +94,22 @@ class Copy_Repeat_v1_ENV(Env):
         self.mode = m
         self.n_exclude = n_exclude
 
-    def reset(self):
+    def reset(self, episode_index=None):
+        self._episode_index = episode_index
+        if self.fast:
+            return self._reset_fast()
         self.position = 0
         self.last_action = None
         self.last_reward = None
         self.episode_total_reward = 0.0
-        self.input_str, self.target_str = self._generate_input_target()
+        self.input_str, self.target_str = self._new_episode()
         self.output_str = ''
         obs_char, obs_idx = self._get_observation()
         return obs_idx
 
     def step(self, action):
+        if self.fast:
+            return self._step_fast(action)
         assert self.action_space.contains(action)
         assert 0 <= self.position < self.target_length
         target_act = self.ALPHABET.index(self.target_str[self.position])
@@ -128,51 +150,12 @@ class Copy_Repeat_v1_ENV(Env):
         return
 
     def _generate_input_target(self):
-        if self.mode == "full":
-            input_str = self._gen_full()
-        elif self.mode == "major":
-            input_str = self._gen_major()
-        else:
-            input_str = self._gen_minor()
-        target_str = ""
-        for i in range(self.repeat):
-            if i % 2 == 1:
-                target_str += input_str[::-1]
-            else:
-                target_str += input_str
-        return input_str, target_str
-
-    def _gen_full(self):
-        input_str = ""
-        candidates = self.ALPHABET[:self.n_char]
-        for i in range(self.size):
-            c = self.np_random.choice(candidates)
-            input_str += c
-        return input_str
-
-    def _gen_major(self):
-        input_str = ""
-        for i in range(self.size):
-            candidates = self.ALPHABET[:self.n_char]
-            for j in range(self.n_exclude):
-                candidates.remove(self.ALPHABET[(i+j) % self.n_char])
-            c = self.np_random.choice(candidates)
-            input_str += c
-        return input_str
-
-    def _gen_minor(self):
-        is_minor = False
-        input_str = ""
-        while not is_minor:
-            input_str = self._gen_full()
-            for i in range(len(input_str)):
-                # there is at least one char that doesn't appear in the
-                # same position in major generation
-                m = [self.ALPHABET[(i+j) % self.n_char] for j in range(self.n_exclude)]
-                if input_str[i] in m:
-                    is_minor = True
-                    break
-        return input_str
+        obs, target, lengths = self._generate_batch(1)
+        return self._decode_episode(obs[0], target[0])
+
+    def _sample_inputs(self, rng, n_episodes):
+        # the exact samplers of the mode, see copy_sampling
+        return sample_inputs(rng, n_episodes, self.size, self.n_char, self.mode, self.n_exclude)
 
     def _get_observation(self, pos=None):
         if pos is None:
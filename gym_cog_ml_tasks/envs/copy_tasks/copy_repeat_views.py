@@ -0,0 +1,139 @@
+"""
+The obs and target of a copy-repeat episode as index mappings over its input array, without storing them:
+- obs position t is input[t] for t < size, the empty symbol after;
+- target position t is in block t // size, the input read forward in the even blocks and reversed in the odd ones.
+An episode then takes O(size) memory whatever the repeat, and reading one position is O(1).
+"""
+
+import copy
+
+import numpy as np
+
+
+def repeat_index(t, size):
+    """
+    :param t: an int array of target positions
+    :param size: the length of the input
+    :return: the input index of each position
+    """
+    block, offset = np.divmod(t, max(size, 1))
+    return np.where(block % 2 == 1, size - 1 - offset, offset)
+
+
+class IndexView:
+    """
+    A read-only array of shape inputs.shape[:-1] + (length,), whose element [..., t] is inputs[..., source(t)], or
+    fill where source(t) is -1, computed when read. Indexing with ints, slices and int or bool arrays follows numpy;
+    when the last axis is taken whole, e.g. view[i] or view[i, :], the result is a view of the selected input rows.
+    np.asarray(view) builds the whole array.
+    """
+
+    def __init__(self, inputs, length, fill=0):
+        self.inputs = inputs
+        self.length = length
+        self.fill = inputs.dtype.type(fill)
+        self.dtype = inputs.dtype
+        self.shape = inputs.shape[:-1] + (length,)
+        self.ndim = len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return "%s(shape=%s, dtype=%s)" % (type(self).__name__, self.shape, self.dtype)
+
+    def source(self, t):
+        """
+        :param t: an int array of positions
+        :return: the input index of each position, -1 where the element is fill
+        """
+        raise NotImplementedError
+
+    def _item(self, t):
+        # the element at position 0 <= t < length of a 1-d view
+        i = int(self.source(t))
+        return self.inputs[i] if i >= 0 else self.fill
+
+    def __getitem__(self, key):
+        if self.ndim == 1 and isinstance(key, (int, np.integer)):
+            t = key + self.length if key < 0 else key
+            if not 0 <= t < self.length:
+                raise IndexError("index %d is out of bounds for length %d" % (key, self.length))
+            return self._item(t)
+        key = key if isinstance(key, tuple) else (key,)
+        if len(key) > self.ndim:
+            raise IndexError("too many indices for a %d-d view" % self.ndim)
+        lead = key[:self.ndim - 1]
+        last = key[self.ndim - 1] if len(key) == self.ndim else slice(None)
+        if isinstance(last, slice) and last.indices(self.length) == (0, self.length, 1):
+            return self._rows(self.inputs[lead])
+        return self._take(lead, np.arange(self.length)[last])
+
+    def _rows(self, inputs):
+        view = copy.copy(self)
+        view.inputs = inputs
+        view.shape = inputs.shape[:-1] + (self.length,)
+        view.ndim = len(view.shape)
+        return view
+
+    def _take(self, lead, t):
+        src = self.source(t)
+        out = np.where(src < 0, self.fill, self.inputs[lead + (np.maximum(src, 0),)])
+        return out[()] if out.ndim == 0 else out
+
+    def __array__(self, dtype=None, copy=None):
+        out = self._take((Ellipsis,), np.arange(self.length))
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+
+class PaddedView(IndexView):
+    """
+    The obs of copy-repeat episodes: the input, then fill up to length.
+    """
+
+    def source(self, t):
+        size = self.inputs.shape[-1]
+        return np.where(t < size, t, -1)
+
+    def __getitem__(self, key):
+        # the step path: an int position of a 1-d view
+        if type(key) is int and self.ndim == 1 and 0 <= key < self.length:
+            return self.inputs[key] if key < self.inputs.shape[-1] else self.fill
+        return IndexView.__getitem__(self, key)
+
+    def _item(self, t):
+        return self.inputs[t] if t < self.inputs.shape[-1] else self.fill
+
+
+class RepeatView(IndexView):
+    """
+    The target of copy-repeat episodes: repeat blocks of the input, reversed every other block, see repeat_index.
+    """
+
+    def __init__(self, inputs, repeat):
+        super().__init__(inputs, inputs.shape[-1] * repeat)
+        self.repeat = repeat
+
+    def source(self, t):
+        return repeat_index(t, self.inputs.shape[-1])
+
+    def __getitem__(self, key):
+        # the step path: an int position of a 1-d view
+        if type(key) is int and self.ndim == 1 and 0 <= key < self.length:
+            return self._item(key)
+        return IndexView.__getitem__(self, key)
+
+    def _item(self, t):
+        size = self.inputs.shape[-1]
+        block, offset = divmod(t, size)
+        return self.inputs[size - 1 - offset if block & 1 else offset]
+
+
+def repeat_views(inputs, repeat, empty):
+    """
+    :param inputs: the input indices of one episode of shape (size,), or of N episodes of shape (N, size)
+    :param repeat: the number of blocks of the target
+    :param empty: the index of the empty symbol observed after the input
+    :return: the obs and target views of shape (..., size * repeat)
+    """
+    return PaddedView(inputs, inputs.shape[-1] * repeat, fill=empty), RepeatView(inputs, repeat)
@@ -0,0 +1,68 @@
+"""
+Exact vectorized samplers of the inputs of the v1 copy tasks.
+
+At position i, the n_exclude chars of index (i + j) % n_char, j < n_exclude, are the excluded ones of position i:
+- full: the chars are uniform and independent;
+- major: the inputs without any excluded char, i.e. uniform over the n_char - n_exclude allowed chars at each
+  position, drawn as offsets from i + n_exclude in one call;
+- minor: the full inputs having at least one excluded char. Instead of rejecting the full inputs without any, the
+  position J of the first excluded char is drawn from its law given that there is one (a geometric law truncated
+  to the size); the chars before J are then allowed ones, the char at J an excluded one, and the chars after J are
+  uniform. This is the law of the full inputs conditioned on having an excluded char, in a constant number of draws.
+
+tests/test_copy_sampling.py compares them with the exact laws.
+"""
+
+import numpy as np
+
+
+def sample_full(rng, n_episodes, size, n_char):
+    return rng.choice(n_char, size=(n_episodes, size))
+
+
+def sample_major(rng, n_episodes, size, n_char, n_exclude):
+    if n_exclude >= n_char:
+        raise ValueError("major mode needs n_exclude < n_char, got %d >= %d" % (n_exclude, n_char))
+    pos = np.arange(size)
+    return (pos + n_exclude + rng.choice(n_char - n_exclude, size=(n_episodes, size))) % n_char
+
+
+def first_excluded(rng, n_episodes, size, p):
+    """
+    :param p: the probability that a uniform char is an excluded one
+    :return: the position of the first excluded char of n_episodes full inputs having one, of shape (n_episodes,)
+    """
+    if p >= 1.0:
+        return np.zeros(n_episodes, dtype=np.int64)
+    # inverse cdf of P(J = j) = (1 - p) ** j * p / (1 - (1 - p) ** size), j < size
+    u = rng.random(n_episodes)
+    log_q = np.log1p(-p)
+    j = np.floor(np.log1p(u * np.expm1(size * log_q)) / log_q).astype(np.int64)
+    return np.minimum(j, size - 1)
+
+
+def sample_minor(rng, n_episodes, size, n_char, n_exclude):
+    if not 1 <= n_exclude <= n_char or size < 1:
+        raise ValueError("minor mode needs 1 <= n_exclude <= n_char and size >= 1")
+    pos = np.arange(size)
+    first = first_excluded(rng, n_episodes, size, n_exclude / n_char)
+    # offsets from i: anything after J, in [n_exclude, n_char) before J, in [0, n_exclude) at J
+    offsets = rng.integers(0, n_char, size=(n_episodes, size))
+    before = pos < first[:, None]
+    n_before = int(before.sum())
+    if n_before:
+        offsets[before] = n_exclude + rng.integers(0, n_char - n_exclude, size=n_before)
+    offsets[np.arange(n_episodes), first] = rng.integers(0, n_exclude, size=n_episodes)
+    return (pos + offsets) % n_char
+
+
+def sample_inputs(rng, n_episodes, size, n_char, mode, n_exclude=1):
+    """
+    :param mode: 'full', 'major' or 'minor'
+    :return: the input indices of n_episodes, of shape (n_episodes, size)
+    """
+    if mode == "full":
+        return sample_full(rng, n_episodes, size, n_char)
+    if mode == "major":
+        return sample_major(rng, n_episodes, size, n_char, n_exclude)
+    return sample_minor(rng, n_episodes, size, n_char, n_exclude)
@@ -12,22 +12,28 @@ AUTHOR: Zenggo
 DATE: 04.2020
 """
 
-from gym import Env
 from gym.spaces import Discrete
 from gym.utils import colorize, seeding
 import numpy as np
 import sys
 import string
 
+from gym_cog_ml_tasks.envs.task_env import SeqTaskEnv
 
-class Simple_Copy_ENV(Env):
+
+class Simple_Copy_ENV(SeqTaskEnv):
 
     ALPHABET = list(string.ascii_uppercase[:26])
 
-    def __init__(self, n_char=5, size=10):
+    def __init__(self, n_char=5, size=10, fast=False, one_hot=False, defer_reset=False, async_reset=False, tokens=False):
         """
-        :param n_char: number of different chars in inputs, e.g. 3 => {A,B,C}
+        :param n_char: number of different chars in inputs, e.g. 3 => {A,B,C}, or of tokens beyond 26
         :param size: the length of input sequence
+        :param fast: keep the episode as integer arrays for a faster step(), see SeqTaskEnv
+        :param one_hot: observe float32 one-hot vectors instead of indices, see SeqTaskEnv
+        :param defer_reset: don't generate an episode here, the first one is generated by the first reset()
+        :param async_reset: generate the next episode in a worker thread after each reset(), see TaskEnv; implies fast
+        :param tokens: keep the episodes as uint8/16/32 token arrays, see SeqTaskEnv; implies fast, set when n_char > 26
         """
         self.n_char = n_char
         self.size = size
@@ -46,9 +52,17 @@ class Simple_Copy_ENV(Env):
         self.target_str = None
         self.output_str = None
 
+        self.fast = fast or one_hot or async_reset
+        self.async_reset = async_reset
+        if tokens or n_char > len(self.ALPHABET):
+            self._set_tokens(self.ALPHABET)
+        if one_hot:
+            self._set_one_hot()
+
         self.np_random = None
         self.seed()
-        self.reset()
+        if not defer_reset:
+            self.reset()
 
     @property
     def input_length(self):
@@ -58,17 +72,22 @@ class Simple_Copy_ENV(Env):
         self.np_random, seed = seeding.np_random(seed)
         return [seed]
 
-    def reset(self):
+    def reset(self, episode_index=None):
+        self._episode_index = episode_index
+        if self.fast:
+            return self._reset_fast()
         self.position = 0
         self.last_action = None
         self.last_reward = None
         self.episode_total_reward = 0.0
-        self.input_str, self.target_str = self._generate_input_target()
+        self.input_str, self.target_str = self._new_episode()
         self.output_str = ''
         obs_char, obs_idx = self._get_observation()
         return obs_idx
 
     def step(self, action):
+        if self.fast:
+            return self._step_fast(action)
         assert self.action_space.contains(action)
         assert 0 <= self.position < self.input_length
         target_act = self.ALPHABET.index(self.target_str[self.position])
@@ -115,6 +134,24 @@ class Simple_Copy_ENV(Env):
         target_str = input_str
         return input_str, target_str
 
+    def _generate_batch(self, n_episodes, rng=None):
+        """
+        vectorized counterpart of _generate_input_target, producing n_episodes at once.
+        :param n_episodes: the number of episodes to generate
+        :param rng: the random generator to draw from, default self.np_random
+        :return: obs and target index matrices of shape (n_episodes, T), and episode lengths of shape (n_episodes,)
+        """
+        if rng is None:
+            rng = self.np_random
+        obs = rng.choice(self.n_char, size=(n_episodes, self.size)).astype(self.token_dtype, copy=False)
+        return obs, obs.copy(), np.full(n_episodes, self.size, dtype=np.int64)
+
+    def _decode_episode(self, obs, target):
+        return self._to_str(obs, self.ALPHABET), self._to_str(target, self.ALPHABET)
+
+    def _decode_actions(self, actions):
+        return self._to_str(actions, self.ALPHABET)
+
     def _get_observation(self, pos=None):
         if pos is None:
             pos = self.position
@@ -27,155 +27,188 @@ DATE: 05.2020
 '''
 
 
-from gym import Env
 from gym.spaces import Discrete
 from gym.utils import colorize, seeding
 import numpy as np
 import sys
 
-class Saccade_ENV(Env):
+from gym_cog_ml_tasks.envs.task_env import TaskEnv
+
+class Saccade_ENV(TaskEnv):
     FIX_MARK = ['P','A']
     LOC_MARK = ['L','R']
     ACTIONS = ['Front', 'Left', 'Right']
     POS = ['Fix', 'Cue', 'Delay', 'Go']
     OBS_IDX = ['Empty', 'P', 'PR', 'PL', 'A', 'AL', 'AR']
+    # the position of each timestep of a trial
+    TRIAL_POS = ['Fix', 'Fix', 'Cue', 'Delay', 'Delay', 'Go']
+    # the reward of each timestep of a trial for a wrong action, see go_reward for the correct ones
+    TRIAL_REWARD_WRONG = [0, 0, -1, -1, -1, 0]
 
-    def __init__(self, go_reward=10):
+    def __init__(self, go_reward=10, n_trials=1, one_hot=False, defer_reset=False, async_reset=False):
 
-        # go reward: last reward of the episode, default 10
+        # go reward: last reward of a trial, default 10
         self.go_reward = go_reward
+        # number of trials run back to back in one episode, default 1
+        self.n_trials = n_trials
+        # defer reset: don't generate an episode here, the first one is generated by the first reset()
+        # async reset: generate the next episode in a worker thread after each reset(), see TaskEnv
+        self.async_reset = async_reset
         # observation: Empty, P, PR, PL, A, AL, AR
         self.observation_space = Discrete(7)
+        # one hot: observe float32 one-hot vectors, the rows of a (T, 7) matrix built by reset()
+        if one_hot:
+            self._set_one_hot()
         # action: F, L, R
         self.action_space = Discrete(len(self.ACTIONS))
+
+        # the schedule of the 4 possible trials, indexed by fix mark, location cue and timestep
+        n_time = len(self.TRIAL_POS)
+        self.trial_obs = np.empty((len(self.FIX_MARK), len(self.LOC_MARK), n_time), dtype=np.int64)
+        self.trial_target = np.full_like(self.trial_obs, self.ACTIONS.index('Front'))
+        for f, fix in enumerate(self.FIX_MARK):
+            for l, loc in enumerate(self.LOC_MARK):
+                fix_obs, cue_obs = self.OBS_IDX.index(fix), self.OBS_IDX.index(fix + loc)
+                self.trial_obs[f, l] = [fix_obs, fix_obs, cue_obs, fix_obs, fix_obs, self.OBS_IDX.index('Empty')]
+                # pro-saccade: same direction as the location cue, anti-saccade: the opposite one
+                go = 'Left' if (loc == 'L') == (fix == 'P') else 'Right'
+                self.trial_target[f, l, -1] = self.ACTIONS.index(go)
+        # the length of the current episode, set by reset()
+        self.length = n_time * n_trials
+
         # state of an episode
-        self.pos = None
         self.time = 0
-        self.screen = None
         self.total_reward = None
         self.input_data = None
         self.last_action = None
         self.last_reward = None
-        self.output_act = None
+        self._obs_seq = None
+        self._obs_out = None
+        self._target_seq = None
+        self._output_seq = np.zeros(self.length, dtype=np.int64)
 
         self.np_random =None
         self.seed()
-        self.reset()
+        if not defer_reset:
+            self.reset()
+
+    @property
+    def go_reward(self):
+        return self._go_reward
+
+    @go_reward.setter
+    def go_reward(self, value):
+        # the reward of each timestep of a trial for a correct action, read by step()
+        self._go_reward = value
+        self.reward_correct = [1, 1, 0, 0, 0, value]
+
+    @property
+    def episode_length(self):
+        # 0 before the first reset
+        return len(self._target_seq) if self._target_seq is not None else 0
+
+    @property
+    def trial(self):
+        return self.time // len(self.TRIAL_POS)
+
+    @property
+    def pos(self):
+        return self.TRIAL_POS[self.time % len(self.TRIAL_POS)] if self.time < self.length else None
+
+    @property
+    def screen(self):
+        return self.OBS_IDX[self._obs_seq[self.time]] if self.time < self.length else None
+
+    @property
+    def output_act(self):
+        # the colorized history of actions
+        output = ''
+        for t in range(self.time):
+            color = 'green' if self._output_seq[t] == self._target_seq[t] else 'red'
+            output += colorize(self.ACTIONS[self._output_seq[t]], color, highlight=True)
+        return output
 
     def seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
         return [seed]
 
-    def _generate_input_data(self):
-        input_data = np.random.choice(self.FIX_MARK) + np.random.choice(self.LOC_MARK)
-        return input_data
-
-    def _generate_target(self, pos=None):
-        if pos == None:
-            return None
-        if pos == self.POS[0]:
-            fix_target = self.ACTIONS[0]
-            return fix_target
-        if pos == self.POS[1]:
-            cue_target = self.ACTIONS[0]
-            return cue_target
-        if pos == self.POS[2]:
-            delay_target = self.ACTIONS[0]
-            return delay_target
-        if pos == self.POS[3]:
-            if self.input_data[0] == self.FIX_MARK[0]:
-                if self.input_data[1] == self.LOC_MARK[0]:
-                    go_target = self.ACTIONS[1]
-                if self.input_data[1] == self.LOC_MARK[1]:
-                    go_target = self.ACTIONS[2]
-            if self.input_data[0] == self.FIX_MARK[1]:
-                if self.input_data[1] == self.LOC_MARK[0]:
-                    go_target = self.ACTIONS[2]
-                if self.input_data[1] == self.LOC_MARK[1]:
-                    go_target = self.ACTIONS[1]
-            return go_target
-
-    def _get_obs(self):
-        if self.pos == None:
-            self.screen = None
-            return None
-        if self.pos == self.POS[0]:
-            self.screen = self.input_data[0]
-        if self.pos == self.POS[1]:
-            self.screen = self.input_data
-        if self.pos == self.POS[2]:
-            self.screen = self.input_data[0]
-        if self.pos == self.POS[3]:
-            self.screen = 'Empty'
-        return self.OBS_IDX.index(self.screen)
-    
-        
-    def reset(self):
+    def _generate_batch(self, n_episodes, rng=None):
+        """
+        draw the trials of n_episodes at once, the n_trials trials of an episode being laid out one after the other.
+        :param n_episodes: the number of episodes to generate
+        :param rng: the random generator to draw from, default self.np_random
+        :return: obs and target index matrices of shape (n_episodes, 6 * n_trials), and episode lengths of shape (n_episodes,)
+        """
+        if rng is None:
+            rng = self.np_random
+        # uniform fix marks and location cues, drawn with random() which is much cheaper than choice() per call
+        u = rng.random((2, n_episodes, self.n_trials))
+        fix = (u[0] * len(self.FIX_MARK)).astype(np.int64)
+        loc = (u[1] * len(self.LOC_MARK)).astype(np.int64)
+        length = len(self.TRIAL_POS) * self.n_trials
+        obs = self.trial_obs[fix, loc].reshape(n_episodes, length)
+        target = self.trial_target[fix, loc].reshape(n_episodes, length)
+        return obs, target, np.full(n_episodes, length, dtype=np.int64)
+
+    def _decode_episode(self, obs, target):
+        # the cue screens show the whole input data, the trials being separated by spaces
+        cues = obs[self.TRIAL_POS.index('Cue')::len(self.TRIAL_POS)]
+        return ' '.join(self.OBS_IDX[c] for c in cues)
+
+    def _episode_target(self):
+        return self._target_seq
+
+    def _rewards(self, correct):
+        # the fix/cue/delay/go reward schedule of each trial, the last axis being the timestep
+        n_trials = correct.shape[-1] // len(self.TRIAL_POS)
+        return np.where(correct, np.tile(self.reward_correct, n_trials), np.tile(self.TRIAL_REWARD_WRONG, n_trials))
+
+    def reset(self, episode_index=None):
+        self._episode_index = episode_index
         self.time = 0
-        self.pos = self.POS[0]
-        self.input_data = self._generate_input_data()
+        self._obs_seq, self._target_seq = self._new_episode_arrays()
+        # n_trials may have changed since the last episode
+        self.length = len(self._target_seq)
+        if len(self._output_seq) < self.length:
+            self._output_seq = np.zeros(self.length, dtype=np.int64)
+        self._obs_out = self._observations(self._obs_seq)
+        self.input_data = self._decode_episode(self._obs_seq, self._target_seq)
         self.total_reward = 0
         self.last_action = None
         self.last_reward = None
-        self.output_act = ''
-        first_obs = self._get_obs()  # set screen and get numerical obs
-        return first_obs
+        return self._obs_out[0]
 
-    
     def step(self, action):
         assert self.action_space.contains(action)
-        assert 0 <= self.time <= 5  # Fix, Fix, Cue, Delay, Delay, Go
-        reward = 0
-        done = False
-        current_act = self.ACTIONS[action]
-        pos = self.pos
-        # get target according to pos
-        target_act = self._generate_target(pos)
-
-        # get reaward according to position, target and output
-        if pos == self.POS[0]:  # Fix
-            if current_act == target_act:
-                reward = 1
-        if pos == self.POS[1]:  # Cue
-            if current_act != target_act: reward = -1
-        if pos == self.POS[2]:  # Delay
-            if current_act != target_act: reward = -1
-        if pos == self.POS[3]:  # go
-            if current_act == target_act:
-                reward = self.go_reward
-
-        color = 'green' if target_act == current_act else 'red'
-        current_act = colorize(current_act, color, highlight=True)
-        self.output_act += current_act
-        self.last_action = current_act
+        t = self.time
+        assert 0 <= t < self.length  # Fix, Fix, Cue, Delay, Delay, Go for each trial
+        target_act = self._target_seq[t]
+        n_time = len(self.TRIAL_POS)
+        if action == target_act:
+            reward = self.reward_correct[t % n_time]
+        else:
+            reward = self.TRIAL_REWARD_WRONG[t % n_time]
+        self._output_seq[t] = action
+        self.last_action = action
         self.last_reward = reward
         self.total_reward += reward
 
-        # move forward
-        self.time += 1
-        # get pos according to time
-        if 0 <= self.time <= 1:
-            self.pos = self.POS[0]
-        elif self.time == 2:
-            self.pos = self.POS[1]
-        elif 3 <= self.time <= 4:
-            self.pos = self.POS[2]
-        elif self.time == 5:
-            self.pos = self.POS[3]
-        else:
-            self.pos = None
-            done = True
-
-        obs = self._get_obs()
-
-        return obs, reward, done, {'target_act': self.ACTIONS.index(target_act)}
+        # move forward, the trial ends on its Go step
+        info = {'target_act': target_act, 'trial': t // n_time, 'trial_done': (t + 1) % n_time == 0}
+        self.time = t = t + 1
+        if t < self.length:
+            return self._obs_out[t], reward, False, info
+        return None, reward, True, info
 
     def render(self, mode='human'):
         outfile = sys.stdout
         screen = self.screen
         pos = self.pos
-        target_act = self._generate_target(pos)
-        last_act = self.last_action
+        target_act = self.ACTIONS[self._target_seq[self.time]] if pos is not None else None
+        last_act = None
+        if self.last_action is not None:
+            color = 'green' if self._output_seq[self.time - 1] == self._target_seq[self.time - 1] else 'red'
+            last_act = colorize(self.ACTIONS[self.last_action], color, highlight=True)
         output = self.output_act
         input_data = self.input_data
         last_reward = self.last_reward
@@ -193,6 +226,8 @@ class Saccade_ENV(Env):
         outfile.write("="*20 + "\n")
         outfile.write("Input data: " + input_data + "\n")
         outfile.write("Time: %d\n" %self.time )
+        if self.n_trials > 1:
+            outfile.write("Trial: %d/%d\n" % (min(self.trial + 1, self.n_trials), self.n_trials))
         outfile.write("Position: " + pos + "\n")
         outfile.write("Screen: " + screen +"\n")
         outfile.write("Target Action: " + target_act +"\n")
@@ -203,4 +238,3 @@ class Saccade_ENV(Env):
         outfile.write("Cumulative reward: %d\n" %total_reward)
         outfile.write("\n")
         return
-        
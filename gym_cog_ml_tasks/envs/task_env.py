@@ -0,0 +1,543 @@
+"""
+The base class of the task envs.
+
+Besides the step by step gym interface, every task can generate whole episodes as integer arrays:
+a subclass implements _generate_batch(n_episodes, rng), which returns the obs and target index matrices of
+shape (n_episodes, T) (padded with 0 after the end of each episode) and the episode lengths of shape (n_episodes,).
+The obs indices are the ones returned by step(), the target indices the ones in info["target_act"].
+_decode_episode(obs, target) turns one such episode back into the state set by reset(), e.g. (input_str, target_str),
+which lets reset() replay episodes from a corpus, see replay().
+
+Seeding contract, followed by all the registered envs:
+- every random draw of reset(), generate_dataset() and of the generators behind them goes through the env's own
+  generator self.np_random, never through the global np.random state;
+- seed(seed) re-creates self.np_random, so the episodes following seed(s) are the same in any process;
+- an env created without seed() gets its generator from OS entropy, so envs built in different processes
+  (forked or spawned) are independent, whatever the state of np.random they inherit.
+An env built before a fork is copied along with its generator state, seed each copy differently in that case.
+tests/test_seeding.py verifies this for every registered id.
+
+With async_reset=True, reset() swaps in an episode generated by a worker thread right after the previous reset(),
+see _new_episode_arrays(). The worker draws from a copy of self.np_random, which is only advanced when its
+episode is taken, so the episodes are the same as with synchronous resets. The episode is generated again in
+reset() when the worker isn't done, when self.np_random was re-seeded or drawn from in between, or when a param of
+the constructor (e.g. size) was changed in between.
+
+Besides the stream of self.np_random, every env addresses the episodes of a canonical stream by index: episode i of
+seed s is generated from its own counter-based generator, see episode_rng, so episode(i) and reset(episode_index=i)
+take the same time whatever i, and any range of episodes can be produced in any process without the ones before it.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import copy
+from functools import lru_cache
+import inspect
+
+from gym import Env
+from gym.spaces import Box
+from gym.envs.registration import load, registry, spec
+import numpy as np
+
+from gym_cog_ml_tasks.instrument import instrument, uninstrument
+from gym_cog_ml_tasks.pool import EpisodePool
+from gym_cog_ml_tasks.stream import iter_episodes
+
+
+def registered_ids():
+    """
+    :return: the ids of the envs registered by this package
+    """
+    specs = registry.values() if isinstance(registry, dict) else registry.all()
+    return [s.id for s in specs if str(s.entry_point).startswith("gym_cog_ml_tasks.")]
+
+
+def uint_dtype(n):
+    """
+    :param n: the number of indices
+    :return: the smallest unsigned int type holding the indices [0, n)
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    raise ValueError("vocabulary too large: %d" % n)
+
+
+# the constructor params setting how an env is stepped rather than the episodes it generates
+MODE_PARAMS = frozenset(("fast", "one_hot", "defer_reset", "async_reset", "tokens"))
+
+
+@lru_cache(maxsize=None)
+def _generation_param_names(cls):
+    # the names of the constructor params of cls and its bases the episodes depend on, e.g. size
+    names = []
+    for klass in cls.__mro__:
+        if "__init__" not in vars(klass):
+            continue
+        for name, param in inspect.signature(klass.__init__).parameters.items():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD) or name == "self" or name in MODE_PARAMS:
+                continue
+            if name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+@lru_cache(maxsize=16)
+def _episode_key(seed):
+    # the 128-bit Philox key of a seed, any int >= 0
+    return tuple(np.random.SeedSequence(seed).generate_state(2, np.uint64).tolist())
+
+
+def episode_rng(seed, index):
+    """
+    :param seed: the seed of the canonical stream
+    :param index: the index of the episode, >= 0
+    :return: the generator of the episode: Philox keyed by the seed, its counter starting at index in the most
+             significant word, so that the episodes never share draws
+    """
+    if index < 0:
+        raise ValueError("episode index must be >= 0, got %d" % index)
+    key = np.array(_episode_key(seed), dtype=np.uint64)
+    return np.random.Generator(np.random.Philox(counter=[0, 0, 0, index], key=key))
+
+
+def make_task(env_id, **kwargs):
+    """
+    build the env registered as env_id without the wrappers added by gym.make.
+    :param env_id: a registered id, e.g. '12_AX_CPT-v0'
+    :param kwargs: the params of the env
+    """
+    return load(spec(env_id).entry_point)(**kwargs)
+
+
+class TaskEnv(Env):
+
+    # the corpus replayed by reset(), see replay()
+    corpus = None
+    _replay_indices = None
+    _replay_pos = 0
+    # the EpisodePool serving reset(), see use_pool()
+    pool = None
+    # the EnvStats of the timed methods, see instrument()
+    stats = None
+    # one-hot observations, see _set_one_hot()
+    one_hot = False
+    _eye = None
+    # double-buffered reset, see _new_episode_arrays()
+    async_reset = False
+    _reset_executor = None
+    _next_episode = None
+    # the seed of the canonical stream addressed by episode() and reset(episode_index=i)
+    episode_seed = 0
+    _episode_index = None
+
+    def instrument(self, stats=None, callback=None):
+        """
+        time reset, step, render and the episode generation from now on, see gym_cog_ml_tasks.instrument.
+        :param stats: the EnvStats to record to, default a new one
+        :param callback: called as callback(op, ns) after each timed call
+        :return: the EnvStats, also set as self.stats
+        """
+        return instrument(self, stats, callback)
+
+    def uninstrument(self):
+        uninstrument(self)
+
+    def generate_dataset(self, n_episodes):
+        """
+        generate n_episodes at once, following the same rules as reset().
+        :param n_episodes: the number of episodes N
+        :return: obs, target and mask int arrays of shape (N, T), T being the longest episode length;
+                 mask is 1 on the steps of the episodes and 0 on the padding
+        """
+        obs, target, lengths = self._generate_batch(n_episodes)
+        mask = (np.arange(obs.shape[1]) < lengths[:, None]).astype(np.int64)
+        return obs, target, mask
+
+    def iter_episodes(self, batch_size, prefetch=2, seed=None, n_batches=None):
+        """
+        stream batches of episodes generated by a background thread, see gym_cog_ml_tasks.stream.
+        :param batch_size: the number of episodes N of a batch
+        :param prefetch: the number of batches generated ahead, 0 to generate each batch on demand
+        :param seed: the seed of the stream, default one drawn from self.np_random
+        :param n_batches: the number of batches, default an endless stream
+        :return: an iterator of (obs, target, mask) int arrays of shape (N, T), as returned by generate_dataset()
+        """
+        return iter_episodes(self, batch_size, prefetch, seed, n_batches)
+
+    def episode(self, index, seed=None):
+        """
+        generate episode index of the canonical stream of seed, in the same time whatever the index, see episode_rng.
+        :param index: the index of the episode, >= 0
+        :param seed: the seed of the stream, default self.episode_seed
+        :return: the obs and target index arrays of the episode
+        """
+        obs, target = self._generate_arrays(episode_rng(self.episode_seed if seed is None else seed, index))
+        return np.asarray(obs), np.asarray(target)
+
+    def generate_episodes(self, start, stop, seed=None):
+        """
+        generate the episodes [start, stop) of the canonical stream of seed, e.g. the shard of one worker.
+        :return: obs, target and mask int arrays of shape (N, T), as returned by generate_dataset()
+        """
+        episodes = [self.episode(i, seed) for i in range(start, stop)]
+        lengths = np.array([len(target) for _, target in episodes], dtype=np.int64)
+        width = int(lengths.max(initial=0))
+        dtype = episodes[0][0].dtype if episodes else np.int64
+        obs = np.zeros((len(episodes), width), dtype=dtype)
+        target = np.zeros((len(episodes), width), dtype=dtype)
+        for k, (o, t) in enumerate(episodes):
+            obs[k, :lengths[k]] = o
+            target[k, :lengths[k]] = t
+        mask = (np.arange(width) < lengths[:, None]).astype(np.int64)
+        return obs, target, mask
+
+    def evaluate(self, actions):
+        """
+        score a whole action sequence against the current episode at once, as step() would reward it.
+        :param actions: int array of shape (T,), T being the length of the episode
+        :return: the rewards of shape (T,), the total reward and the accuracy
+        """
+        target = self._episode_target()
+        actions = np.asarray(actions)
+        if actions.shape != target.shape:
+            raise ValueError("expected actions of shape %s, got %s" % (target.shape, actions.shape))
+        correct = actions == target
+        rewards = self._rewards(correct)
+        return rewards, rewards.sum(), correct.mean()
+
+    def evaluate_batch(self, actions, target, mask):
+        """
+        score the action sequences of N episodes at once, e.g. the ones of generate_dataset().
+        :param actions: int matrix of shape (N, T)
+        :param target: the target matrix of shape (N, T)
+        :param mask: the mask of shape (N, T), 1 on the steps of the episodes and 0 on the padding
+        :return: the rewards of shape (N, T), 0 on the padding, the total rewards and the accuracies of shape (N,),
+                 the accuracy of an episode without any step being 0
+        """
+        mask = np.asarray(mask, dtype=bool)
+        correct = np.asarray(actions) == target
+        rewards = np.where(mask, self._rewards(correct), 0)
+        n_steps = mask.sum(axis=1)
+        accuracies = np.divide((correct & mask).sum(axis=1), n_steps, out=np.zeros(len(n_steps)), where=n_steps > 0)
+        return rewards, rewards.sum(axis=1), accuracies
+
+    def _episode_target(self):
+        # the target indices of the current episode
+        raise NotImplementedError
+
+    def _rewards(self, correct):
+        """
+        :param correct: bool array of shape (T,) or (N, T), whether the action of each step is the target one
+        :return: the rewards of the steps
+        """
+        raise NotImplementedError
+
+    def replay(self, corpus, indices=None):
+        """
+        make reset() feed the episodes of a corpus instead of generating them.
+        :param corpus: an EpisodeCorpus generated with the same env and params, None to generate the episodes again
+        :param indices: the indices of the episodes to replay in order, default all of them; they are cycled through
+        """
+        if corpus is not None:
+            self._check_corpus(corpus)
+        self.corpus = corpus
+        self._replay_indices = None
+        if corpus is not None:
+            self._replay_indices = np.arange(len(corpus)) if indices is None else np.asarray(indices)
+        self._replay_pos = 0
+
+    def _check_corpus(self, corpus):
+        # the episodes of another env, or of another vocabulary, would be decoded into wrong ones
+        source = make_task(corpus.env_id, **dict(corpus.kwargs, defer_reset=True))
+        if type(source) is not type(self):
+            raise ValueError("a corpus of %s (%s) can't be replayed by %s"
+                             % (corpus.env_id, type(source).__name__, type(self).__name__))
+        vocab, corpus_vocab = (self.n_obs, self.action_space.n), (source.n_obs, source.action_space.n)
+        if vocab != corpus_vocab:
+            raise ValueError("the corpus has %d obs and %d actions, the env %d and %d" % (corpus_vocab + vocab))
+
+    def use_pool(self, capacity, policy="sample", refresh=None):
+        """
+        make reset() serve episodes from a pool generated in bulk, see gym_cog_ml_tasks.pool.
+        :param capacity: the number of episodes of the pool, None to generate each episode again
+        :param policy: "sample", "window" or "fifo"
+        :param refresh: the number of episodes replaced per refill with "window" and "fifo", default capacity
+        :return: the EpisodePool, also set as self.pool
+        """
+        self.pool = None if capacity is None else EpisodePool(self, capacity, policy, refresh)
+        return self.pool
+
+    def _next_replay_index(self):
+        i = self._replay_indices[self._replay_pos % len(self._replay_indices)]
+        self._replay_pos += 1
+        return i
+
+    def _indexed_episode(self):
+        # the episode addressed by reset(episode_index=i), for this reset only
+        index, self._episode_index = self._episode_index, None
+        return self.episode(index)
+
+    def _new_episode(self):
+        # the episode of the next reset(), returns what _generate_episode returns
+        if self._episode_index is not None:
+            return self._decode_episode(*self._indexed_episode())
+        if self.corpus is not None:
+            return self._decode_episode(*self.corpus[self._next_replay_index()])
+        if self.pool is not None:
+            return self._decode_episode(*self.pool.next())
+        return self._generate_episode()
+
+    def _new_episode_arrays(self):
+        # the obs and target indices of the next reset(), generated, served by the pool or replayed from a corpus
+        if self._episode_index is not None:
+            return self._indexed_episode()
+        if self.corpus is not None:
+            return self.corpus[self._next_replay_index()]
+        if self.pool is not None:
+            return self.pool.next()
+        if not self.async_reset:
+            return self._generate_arrays(self.np_random)
+        episode = self._take_next_episode()
+        self._prefetch_next_episode()
+        return episode
+
+    def _generate_arrays(self, rng):
+        obs, target, lengths = self._generate_batch(1, rng)
+        return obs[0, :lengths[0]], target[0, :lengths[0]]
+
+    def _prefetch_next_episode(self):
+        # start generating the episode of the next reset() from a copy of self.np_random
+        if self._reset_executor is None:
+            self._reset_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async_reset")
+        state = self.np_random.bit_generator.state
+        rng = copy.deepcopy(self.np_random)
+        future = self._reset_executor.submit(self._generate_arrays, rng)
+        self._next_episode = (self.np_random, state, self._generation_params(), rng, future)
+
+    def _generation_params(self):
+        # the values of the constructor params the episodes depend on, as held by the env
+        return tuple(getattr(self, name, None) for name in _generation_param_names(type(self)))
+
+    def _take_next_episode(self):
+        # the prefetched episode if it is ready and drawn from the current state of self.np_random with the current
+        # params, else a new one
+        next_episode, self._next_episode = self._next_episode, None
+        if next_episode is not None:
+            source, state, params, rng, future = next_episode
+            if (future.done() and source is self.np_random and source.bit_generator.state == state
+                    and params == self._generation_params()):
+                episode = future.result()
+                source.bit_generator.state = rng.bit_generator.state
+                return episode
+            future.cancel()
+        return self._generate_arrays(self.np_random)
+
+    def close(self):
+        if self._reset_executor is not None:
+            self._reset_executor.shutdown(wait=True, cancel_futures=True)
+            self._reset_executor = None
+        self._next_episode = None
+
+    def _generate_episode(self):
+        return self._generate_input_target()
+
+    def _decode_episode(self, obs, target):
+        """
+        :param obs: the obs indices of one episode
+        :param target: the target indices of one episode
+        :return: the episode state, as returned by _generate_episode
+        """
+        raise NotImplementedError
+
+    def _generate_batch(self, n_episodes, rng=None):
+        """
+        :param n_episodes: the number of episodes to generate
+        :param rng: the random generator to draw from, default self.np_random
+        :return: obs and target index matrices of shape (n_episodes, T), and episode lengths of shape (n_episodes,)
+        """
+        raise NotImplementedError
+
+    def _set_one_hot(self):
+        # observe the rows of the identity matrix instead of the indices of the Discrete observation space
+        n_obs = self.observation_space.n
+        self._eye = np.eye(n_obs, dtype=np.float32)
+        self.observation_space = Box(0.0, 1.0, (n_obs,), dtype=np.float32)
+        self.one_hot = True
+
+    @property
+    def n_obs(self):
+        return len(self._eye) if self.one_hot else self.observation_space.n
+
+    def _observations(self, obs):
+        # the observations returned along an episode of obs indices, one-hot rows are views of a (T, n_obs) matrix
+        return self._eye[obs] if self.one_hot else obs
+
+    @staticmethod
+    def _to_str(idx, chars):
+        # map an index array to a string through a byte lookup table, chars must be single ascii chars
+        table = np.frombuffer(''.join(chars).encode('ascii'), dtype=np.uint8)
+        return table[idx].tobytes().decode('ascii')
+
+    @staticmethod
+    def _from_str(s, chars):
+        # the inverse of _to_str
+        table = np.zeros(256, dtype=np.int64)
+        table[np.frombuffer(''.join(chars).encode('ascii'), dtype=np.uint8)] = np.arange(len(chars))
+        return table[np.frombuffer(s.encode('ascii'), dtype=np.uint8)]
+
+
+class SeqTaskEnv(TaskEnv):
+    """
+    The base class of the sequence tasks: an episode is an input and a target string, and each step is rewarded
+    1.0 when the action is the target one, -1.0 otherwise.
+
+    With fast=True the episode is kept as integer arrays, and step() only reads the target and the next obs and
+    writes the action; the action is not validated, and the info dict returned is reused by the next step.
+    input_str, target_str and output_str are then decoded from the arrays when read, e.g. by render().
+
+    With one_hot=True the observations are float32 one-hot vectors, the rows of a (T, n_obs) matrix built once by
+    reset(); one_hot implies fast.
+
+    With tokens, see _set_tokens(), the episode arrays are of the smallest unsigned type holding the indices, so the
+    vocabulary isn't bounded by the chars of the strings; the strings are only decoded when every index has a char,
+    the episode is otherwise read through obs_tokens, target_tokens and output_tokens.
+    """
+
+    fast = False
+    tokens = False
+    # the type of the obs and target arrays of the episodes
+    token_dtype = np.dtype(np.int64)
+    _has_str = True
+    _input_str = None
+    _target_str = None
+    _output_str = None
+    # the episode in fast mode
+    _obs_seq = None
+    _obs_out = None
+    _target_seq = None
+    _output_seq = None
+    _length = 0
+    _decoded = None
+    _info = None
+
+    @property
+    def input_str(self):
+        if self.fast and self._obs_seq is not None:
+            return self._decoded_episode()[0]
+        return self._input_str
+
+    @input_str.setter
+    def input_str(self, value):
+        self._input_str = value
+
+    @property
+    def target_str(self):
+        if self.fast and self._obs_seq is not None:
+            return self._decoded_episode()[1]
+        return self._target_str
+
+    @target_str.setter
+    def target_str(self, value):
+        self._target_str = value
+
+    @property
+    def output_str(self):
+        if self.fast and self._obs_seq is not None:
+            self._check_str()
+            return self._decode_actions(self._output_seq[:self.position])
+        return self._output_str
+
+    @output_str.setter
+    def output_str(self, value):
+        self._output_str = value
+
+    # the episode may be held as index views, see copy_repeat_views, built into arrays when read
+    @property
+    def obs_tokens(self):
+        return np.asarray(self._obs_seq)
+
+    @property
+    def target_tokens(self):
+        return np.asarray(self._target_seq)
+
+    @property
+    def output_tokens(self):
+        return self._output_seq[:self.position]
+
+    @property
+    def episode_length(self):
+        # 0 before the first reset
+        if self.fast:
+            return self._length
+        return len(self._target_str) if self._target_str is not None else 0
+
+    @property
+    def episode_nbytes(self):
+        # the bytes held by the obs and target of the episode in fast mode; an index view holds its inputs, which the
+        # obs and target views of an episode share and are counted once
+        buffers = {}
+        for seq in (self._obs_seq, self._target_seq):
+            held = getattr(seq, "inputs", seq)
+            buffers[id(held)] = held.nbytes
+        return sum(buffers.values())
+
+    def _set_tokens(self, chars):
+        """
+        keep the episodes as arrays of the smallest unsigned type holding the obs and action indices; implies fast.
+        :param chars: the chars of the action indices, the strings are only decoded when there is one per index
+        """
+        self.token_dtype = uint_dtype(max(self.observation_space.n, self.action_space.n))
+        self.tokens = True
+        self.fast = True
+        self._has_str = self.action_space.n <= len(chars)
+
+    def _check_str(self):
+        if not self._has_str:
+            raise ValueError("a vocabulary of %d tokens has no string form, read obs_tokens, target_tokens and "
+                             "output_tokens instead" % self.action_space.n)
+
+    def _decoded_episode(self):
+        self._check_str()
+        if self._decoded is None:
+            self._decoded = self._decode_episode(self._obs_seq, self._target_seq)
+        return self._decoded
+
+    def _decode_actions(self, actions):
+        return self._to_str(actions, self.ACTIONS)
+
+    def _encode_actions(self, s):
+        return self._from_str(s, self._decode_actions(np.arange(self.action_space.n)))
+
+    def _episode_target(self):
+        return self.target_tokens if self.fast else self._encode_actions(self.target_str)
+
+    def _rewards(self, correct):
+        return np.where(correct, 1.0, -1.0)
+
+    def _reset_fast(self):
+        self._obs_seq, self._target_seq = self._new_episode_arrays()
+        self._length = len(self._target_seq)
+        if self._output_seq is None or len(self._output_seq) < self._length:
+            self._output_seq = np.empty(self._length, dtype=np.int64)
+        self._obs_out = self._observations(self._obs_seq)
+        self._decoded = None
+        self._info = {"target_act": None}
+        self.position = 0
+        self.last_action = None
+        self.last_reward = None
+        self.episode_total_reward = 0.0
+        return self._obs_out[0]
+
+    def _step_fast(self, action):
+        pos = self.position
+        target_act = self._target_seq[pos]
+        reward = 1.0 if action == target_act else -1.0
+        self._output_seq[pos] = action
+        self.last_action = action
+        self.last_reward = reward
+        self.episode_total_reward += reward
+        self.position = pos = pos + 1
+        self._info["target_act"] = target_act
+        if pos < self._length:
+            return self._obs_out[pos], reward, False, self._info
+        return None, reward, True, self._info
@@ -9,23 +9,28 @@ AUTHOR: JiqingFeng
 DATE: 05.2020
 """
 
-from gym import Env
 from gym.spaces import Discrete
 from gym.utils import colorize, seeding
 import numpy as np
 import sys
 
+from gym_cog_ml_tasks.envs.task_env import SeqTaskEnv
 
-class seq_prediction_ENV(Env):
+
+class seq_prediction_ENV(SeqTaskEnv):
 
     STR_in = ['ABC', 'XBC']
     CHAR_in = ['A', 'B', 'C', 'X']
     ACTIONS = ['B', 'C', 'D', 'Y']
 
-    def __init__(self, size=100, p=0.5):
+    def __init__(self, size=100, p=0.5, fast=False, one_hot=False, defer_reset=False, async_reset=False):
         """
         :param size: the number of inputing stimuli/cues
         :param p: the probability to generate 'ABC' or 'XBC'
+        :param fast: keep the episode as integer arrays for a faster step(), see SeqTaskEnv
+        :param one_hot: observe float32 one-hot vectors instead of indices, see SeqTaskEnv
+        :param defer_reset: don't generate an episode here, the first one is generated by the first reset()
+        :param async_reset: generate the next episode in a worker thread after each reset(), see TaskEnv; implies fast
         """
         # observation (characters)
         self.idx_2_char = self.CHAR_in
@@ -49,9 +54,15 @@ class seq_prediction_ENV(Env):
         self.target_str = None
         self.output_str = None
 
+        self.fast = fast or one_hot or async_reset
+        self.async_reset = async_reset
+        if one_hot:
+            self._set_one_hot()
+
         self.np_random = None
         self.seed()
-        self.reset()
+        if not defer_reset:
+            self.reset()
 
     @property
     def input_length(self):
@@ -61,17 +72,22 @@ class seq_prediction_ENV(Env):
         self.np_random, seed = seeding.np_random(seed)
         return [seed]
 
-    def reset(self):
+    def reset(self, episode_index=None):
+        self._episode_index = episode_index
+        if self.fast:
+            return self._reset_fast()
         self.position = 0
         self.last_action = None
         self.last_reward = None
         self.episode_total_reward = 0.0
-        self.input_str, self.target_str = self._generate_input_target(self.size)
+        self.input_str, self.target_str = self._new_episode()
         self.output_str = ''
         obs_char, obs_idx = self._get_observation()
         return obs_idx
 
     def step(self, action):
+        if self.fast:
+            return self._step_fast(action)
         assert self.action_space.contains(action)
         assert 0 <= self.position < self.input_length
         target_act = self.ACTIONS.index(self.target_str[self.position])
@@ -110,24 +126,48 @@ class seq_prediction_ENV(Env):
         outfile.write("\n")
         return
 
+    def _generate_episode(self):
+        return self._generate_input_target(self.size)
+
     def _generate_input_target(self, size):
         input_str = ''
         target_str = ''
         for _ in np.arange(int(size/3)):
-            s = np.random.choice(self.STR_in, p=[self.p, 1-self.p])
+            s = self.np_random.choice(self.STR_in, p=[self.p, 1-self.p])
             input_str += s
             if s == 'ABC':
                 target_str += 'BCD'
             else:
                 target_str += 'BCY'
         remainder = int(size % 3)
-        input_str += np.random.choice(self.STR_in, p=[self.p, 1-self.p])[:remainder]
+        input_str += self.np_random.choice(self.STR_in, p=[self.p, 1-self.p])[:remainder]
         if remainder == 1:
             target_str += 'B'
         elif remainder == 2:
             target_str += 'BC'
         return input_str, target_str
 
+    def _generate_batch(self, n_episodes, rng=None):
+        """
+        vectorized counterpart of _generate_input_target, producing n_episodes at once.
+        :param n_episodes: the number of episodes to generate
+        :param rng: the random generator to draw from, default self.np_random
+        :return: obs and target index matrices of shape (n_episodes, T), and episode lengths of shape (n_episodes,)
+        """
+        if rng is None:
+            rng = self.np_random
+        obs_table = np.array([[self.char_2_idx[c] for c in s] for s in self.STR_in])
+        target_table = np.array([[self.ACTIONS.index(c) for c in s] for s in ('BCD', 'BCY')])
+        length = 3 * int(self.size / 3) + int(self.size % 3)
+        # the remainder is cut from one more sequence, whose targets 'B', 'BC' are prefixes of both ones
+        seqs = rng.choice(len(self.STR_in), size=(n_episodes, int(self.size / 3) + 1), p=[self.p, 1 - self.p])
+        obs = obs_table[seqs].reshape(n_episodes, -1)[:, :length]
+        target = target_table[seqs].reshape(n_episodes, -1)[:, :length]
+        return obs, target, np.full(n_episodes, length, dtype=np.int64)
+
+    def _decode_episode(self, obs, target):
+        return self._to_str(obs, self.idx_2_char), self._to_str(target, self.ACTIONS)
+
     def _get_observation(self, pos=None):
         if pos is None:
             pos = self.position
@@ -0,0 +1,167 @@
+"""
+Opt-in timers and counters of the hot paths of an env.
+
+instrument(env) wraps reset, step and render of the env, and the episode generators (_generate_episode,
+_generate_arrays and _generate_batch, timed as "generate"), with timed versions set on the instance. An env that is not instrumented
+runs the class methods untouched, so the instrumentation costs nothing until enabled, and uninstrument(env) removes it.
+
+The calls are recorded in an EnvStats: the count, the total time and a histogram of the durations of each op, in
+power of 2 buckets of nanoseconds, and the distribution of the lengths of the episodes started. EnvStats only holds
+plain ints, so the stats of worker processes can be pickled back and merged, e.g. EnvStats.aggregate(worker_stats).
+
+e.g.
+stats = instrument(env.unwrapped)
+...
+stats.summary()
+"""
+
+from collections import Counter
+import threading
+import time
+
+OPS = ("reset", "generate", "step", "render")
+# durations up to 2 ** 63 ns
+N_BUCKETS = 64
+
+
+class EnvStats(object):
+
+    def __init__(self):
+        self.counts = dict.fromkeys(OPS, 0)
+        self.total_ns = dict.fromkeys(OPS, 0)
+        self.hist = {op: [0] * N_BUCKETS for op in OPS}
+        self.lengths = Counter()
+
+    def record(self, op, ns):
+        """
+        :param op: one of OPS
+        :param ns: the duration of the call, in nanoseconds
+        """
+        self.counts[op] += 1
+        self.total_ns[op] += ns
+        self.hist[op][min(ns.bit_length(), N_BUCKETS - 1)] += 1
+
+    def record_length(self, length, n=1):
+        self.lengths[int(length)] += n
+
+    def merge(self, other):
+        """
+        add the records of other to this one.
+        :return: self
+        """
+        for op in OPS:
+            self.counts[op] += other.counts[op]
+            self.total_ns[op] += other.total_ns[op]
+            self.hist[op] = [a + b for a, b in zip(self.hist[op], other.hist[op])]
+        self.lengths.update(other.lengths)
+        return self
+
+    @classmethod
+    def aggregate(cls, stats):
+        """
+        :param stats: an iterable of EnvStats, e.g. the ones of the workers of a vector env
+        :return: a new EnvStats holding all their records
+        """
+        total = cls()
+        for s in stats:
+            total.merge(s)
+        return total
+
+    def clear(self):
+        self.__init__()
+
+    def summary(self):
+        """
+        :return: a json serializable dict: per op the count, total and mean seconds and the histogram
+                 {upper bound of the bucket in ns: count}, and the episode lengths {length: count}
+        """
+        ops = {}
+        for op in OPS:
+            count = self.counts[op]
+            ops[op] = {
+                "count": count,
+                "total_s": self.total_ns[op] * 1e-9,
+                "mean_s": self.total_ns[op] * 1e-9 / count if count else None,
+                "hist_ns": {2 ** b: n for b, n in enumerate(self.hist[op]) if n},
+            }
+        return {"ops": ops, "lengths": dict(sorted(self.lengths.items()))}
+
+
+def _timed(method, op, stats, callback, after=None):
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        result = method(*args, **kwargs)
+        ns = clock() - start
+        stats.record(op, ns)
+        if after is not None:
+            after(result)
+        if callback is not None:
+            callback(op, ns)
+        return result
+    return wrapper
+
+
+def _timed_generate(env, stats, callback, record_lengths):
+    # _generate_episode and _generate_arrays may call _generate_batch, only the outermost call is timed; the depth
+    # is per thread, as the async prefetch generates in a worker thread while the main thread may generate too
+    clock = time.perf_counter_ns
+    local = threading.local()
+
+    def timed(method, batch):
+        def wrapper(*args, **kwargs):
+            depth = getattr(local, "depth", 0)
+            if depth:
+                return method(*args, **kwargs)
+            local.depth = 1
+            start = clock()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                local.depth = 0
+            ns = clock() - start
+            stats.record("generate", ns)
+            if batch and record_lengths:
+                for length, n in Counter(result[2].tolist()).items():
+                    stats.record_length(length, n)
+            if callback is not None:
+                callback("generate", ns)
+            return result
+        return wrapper
+
+    for name, batch in (("_generate_episode", False), ("_generate_arrays", False), ("_generate_batch", True)):
+        if hasattr(env, name):
+            setattr(env, name, timed(getattr(env, name), batch))
+
+
+def instrument(env, stats=None, callback=None):
+    """
+    time the hot methods of env from now on, see the module doc.
+    :param env: a task env, or a vector env generating its episodes with env.task
+    :param stats: the EnvStats to record to, e.g. one shared by several envs, default a new one
+    :param callback: called as callback(op, ns) after each timed call, e.g. to feed a profiler
+    :return: the EnvStats, also set as env.stats
+    """
+    uninstrument(env)
+    if stats is None:
+        stats = EnvStats()
+    # a task env knows the length of the episode it started, a vector env records the lengths of its batches
+    by_reset = not hasattr(env, "task")
+    record_length = (lambda _: stats.record_length(env.episode_length)) if by_reset else None
+    env.reset = _timed(env.reset, "reset", stats, callback, after=record_length)
+    env.step = _timed(env.step, "step", stats, callback)
+    env.render = _timed(env.render, "render", stats, callback)
+    _timed_generate(getattr(env, "task", env), stats, callback, record_lengths=not by_reset)
+    env.stats = stats
+    return stats
+
+
+def uninstrument(env):
+    """
+    restore the untimed methods of env, its stats are kept.
+    """
+    for target, names in ((env, ("reset", "step", "render")),
+                          (getattr(env, "task", env), ("_generate_episode", "_generate_arrays", "_generate_batch"))):
+        for name in names:
+            target.__dict__.pop(name, None)
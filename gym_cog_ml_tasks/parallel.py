@@ -0,0 +1,122 @@
+"""
+Parallel generation of episodes over a process pool.
+
+The episodes are split into shards of fixed size, and shard k draws from its own generator seeded with the
+k-th child of SeedSequence(seed). A shard thus only depends on the master seed and on its index, so the
+output is bit-identical whatever the number of workers, and the shards never share a random stream.
+
+e.g.
+for obs, target, lengths in iter_shards('12_AX_CPT-v0', 10 ** 6, seed=0, size=100):
+    ...
+write_corpus_parallel('eval.bin', 'Simple_Copy_Repeat-v1', 10 ** 7, seed=0, mode='minor')
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+
+import numpy as np
+
+from gym_cog_ml_tasks.corpus import token_bits, token_dtype, write_batches
+from gym_cog_ml_tasks.envs.task_env import make_task
+
+# the envs built in this process, by env_id and params
+_envs = {}
+
+
+def _get_env(env_id, kwargs):
+    key = (env_id, json.dumps(kwargs, sort_keys=True))
+    if key not in _envs:
+        _envs[key] = make_task(env_id, **kwargs)
+    return _envs[key]
+
+
+def generate_shard(env_id, kwargs, seed_seq, n_episodes):
+    """
+    :param env_id: the registered id of the env
+    :param kwargs: the params of the env
+    :param seed_seq: the SeedSequence of the shard
+    :param n_episodes: the number of episodes of the shard
+    :return: obs, target and lengths of the episodes, as returned by _generate_batch
+    """
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    return _get_env(env_id, kwargs)._generate_batch(n_episodes, rng)
+
+
+def iter_shards(env_id, n_episodes, seed=0, shard_size=10000, max_workers=None, **kwargs):
+    """
+    generate n_episodes over a process pool, yielding the shards in order as they are finished.
+    :param env_id: the registered id of the env, e.g. '12_AX_CPT-v0'
+    :param n_episodes: the number of episodes
+    :param seed: the master seed
+    :param shard_size: the number of episodes of a shard, the output depends on it
+    :param max_workers: the number of processes, default os.cpu_count(); 1 generates in this process
+    :param kwargs: the params of the env
+    :return: an iterator of (obs, target, lengths), as returned by _generate_batch
+    """
+    n_shards = -(-n_episodes // shard_size)
+    seed_seqs = np.random.SeedSequence(seed).spawn(n_shards)
+    sizes = [min(shard_size, n_episodes - k * shard_size) for k in range(n_shards)]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers == 1:
+        for seed_seq, n in zip(seed_seqs, sizes):
+            yield generate_shard(env_id, kwargs, seed_seq, n)
+        return
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        # a bounded number of shards in flight, so finished ones don't pile up in memory
+        jobs = iter(zip(seed_seqs, sizes))
+        pending = deque()
+
+        def submit():
+            job = next(jobs, None)
+            if job is not None:
+                pending.append(executor.submit(generate_shard, env_id, kwargs, *job))
+
+        for _ in range(2 * max_workers):
+            submit()
+        try:
+            while pending:
+                result = pending.popleft().result()
+                submit()
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def generate_dataset_parallel(env_id, n_episodes, seed=0, shard_size=10000, max_workers=None, **kwargs):
+    """
+    the parallel counterpart of generate_dataset(n_episodes), see iter_shards for the params.
+    :return: obs, target and mask int arrays of shape (n_episodes, T), T being the longest episode length
+    """
+    shards = list(iter_shards(env_id, n_episodes, seed, shard_size, max_workers, **kwargs))
+    width = max([obs.shape[1] for obs, _, _ in shards] + [1])
+    obs = np.zeros((n_episodes, width), dtype=np.int64)
+    target = np.zeros((n_episodes, width), dtype=np.int64)
+    lengths = np.zeros(n_episodes, dtype=np.int64)
+    start = 0
+    for o, t, l in shards:
+        obs[start:start + len(o), :o.shape[1]] = o
+        target[start:start + len(t), :t.shape[1]] = t
+        lengths[start:start + len(l)] = l
+        start += len(l)
+    mask = (np.arange(width) < lengths[:, None]).astype(np.int64)
+    return obs, target, mask
+
+
+def write_corpus_parallel(path, env_id, n_episodes, seed=0, shard_size=10000, max_workers=None, packed=False,
+                          **kwargs):
+    """
+    the parallel counterpart of write_corpus, the shards are written to the file in order as they are finished.
+    see iter_shards for the params, and write_corpus for packed.
+    :return: the number of episodes written
+    """
+    env = _get_env(env_id, kwargs)
+    shards = iter_shards(env_id, n_episodes, seed, shard_size, max_workers, **kwargs)
+    return write_batches(path, env_id, kwargs, seed, shards, dtype=token_dtype(env),
+                         packed_bits=token_bits(env) if packed else None,
+                         seeding="SeedSequence.spawn", shard_size=shard_size)
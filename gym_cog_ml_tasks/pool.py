@@ -0,0 +1,138 @@
+"""
+In-memory pool of pre-generated episodes, serving reset() without a generator call per episode.
+
+The pool holds up to capacity episodes as padded index matrices, generated in bulk by _generate_batch. Policies:
+- "sample": each episode is served once, in the order generated (i.e. sampled without replacement, the episodes
+  being independent); the whole pool is generated again once all of them were served;
+- "window": each reset() samples one of the episodes in the pool, with replacement; every capacity resets, the
+  refresh oldest ones are evicted and replaced with new ones, sliding the window;
+- "fifo": the episodes are served in turn, round-robin; every capacity resets, the refresh oldest ones are evicted
+  and replaced with new ones.
+With "window" and "fifo" an episode is thus served about capacity / refresh times on average.
+
+All the draws go through env.np_random, so the episodes served only depend on the seed of the env.
+The episodes are served as views of the pool: a refill of the whole pool allocates new arrays, but a partial one
+("window" and "fifo") overwrites the arrays of the episodes it evicts.
+
+e.g.
+pool = env.use_pool(100000, policy="window", refresh=10000)
+...
+pool.stats()  # {'hits': ..., 'refills': ..., 'generated': ..., 'evicted': ..., 'reuse': ...}
+"""
+
+import numpy as np
+
+POLICIES = ("sample", "window", "fifo")
+
+
+class EpisodePool(object):
+
+    def __init__(self, env, capacity, policy="sample", refresh=None):
+        """
+        :param env: the task env generating the episodes
+        :param capacity: the number of episodes held
+        :param policy: one of POLICIES
+        :param refresh: the number of episodes evicted and generated per refill with "window" and "fifo",
+                        default capacity; "sample" always generates the whole pool
+        """
+        if policy not in POLICIES:
+            raise ValueError("unknown policy %r, expected one of %s" % (policy, POLICIES))
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if refresh is None or policy == "sample":
+            refresh = capacity
+        if not 1 <= refresh <= capacity:
+            raise ValueError("refresh must be in [1, capacity]")
+        self.env = env
+        self.capacity = capacity
+        self.policy = policy
+        self.refresh = refresh
+
+        self.obs = None
+        self.target = None
+        self.lengths = None
+        # the position of the oldest episode, and the next one served by "sample" and "fifo"
+        self._oldest = 0
+        self._next = 0
+        # the resets served since the last refill
+        self._served = 0
+        self.hits = 0
+        self.refills = 0
+        self.generated = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return 0 if self.lengths is None else len(self.lengths)
+
+    def next(self):
+        """
+        :return: the obs and target indices of the episode of the next reset(), views of the pool
+        """
+        if self.lengths is None:
+            self._fill(np.arange(self.capacity))
+        elif self._served == self.capacity:
+            self._evict()
+
+        if self.policy == "window":
+            i = int(self.env.np_random.integers(self.capacity))
+        else:
+            i = self._next
+            self._next = (i + 1) % self.capacity
+        self._served += 1
+        self.hits += 1
+        length = self.lengths[i]
+        return self.obs[i, :length], self.target[i, :length]
+
+    def _evict(self):
+        # replace the refresh oldest episodes with new ones
+        slots = (self._oldest + np.arange(self.refresh)) % self.capacity
+        self.evicted += self.refresh
+        self._fill(slots)
+        self._oldest = (self._oldest + self.refresh) % self.capacity
+        if self.policy == "sample":
+            self._next = 0
+
+    def _fill(self, slots):
+        obs, target, lengths = self.env._generate_batch(len(slots))
+        width = obs.shape[1]
+        if len(slots) == self.capacity:
+            # a whole new pool, the slots are then in order and the episodes served before stay valid
+            self.obs, self.target, self.lengths = obs, target, lengths
+        else:
+            if width > self.obs.shape[1]:
+                self._widen(width)
+            self.obs[slots] = 0
+            self.target[slots] = 0
+            self.obs[slots, :width] = obs
+            self.target[slots, :width] = target
+            self.lengths[slots] = lengths
+        self._served = 0
+        self.refills += 1
+        self.generated += len(slots)
+
+    def _widen(self, width):
+        obs = np.zeros((self.capacity, width), dtype=self.obs.dtype)
+        target = np.zeros((self.capacity, width), dtype=self.target.dtype)
+        obs[:, :self.obs.shape[1]] = self.obs
+        target[:, :self.target.shape[1]] = self.target
+        self.obs, self.target = obs, target
+
+    def clear(self):
+        # drop the episodes, the next reset() fills the pool again; the stats are kept
+        self.obs = self.target = self.lengths = None
+        self._oldest = self._next = self._served = 0
+
+    def stats(self):
+        """
+        :return: hits (the resets served), refills (the bulk generations), generated (the episodes generated),
+                 evicted (the episodes replaced) and reuse (the mean number of resets served per episode generated)
+        """
+        return {
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "hits": self.hits,
+            "refills": self.refills,
+            "generated": self.generated,
+            "evicted": self.evicted,
+            "reuse": self.hits / self.generated if self.generated else None,
+        }
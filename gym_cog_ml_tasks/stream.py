@@ -0,0 +1,103 @@
+"""
+Streams of pre-generated episodes, produced in the background while the consumer trains.
+
+iter_episodes(env, batch_size, prefetch=k) yields batches as returned by generate_dataset, generated by a
+background thread up to k batches ahead into a bounded queue. The batches are drawn one after the other from a
+single generator owned by that thread, so the stream only depends on the seed, not on the timing of the consumer
+nor on prefetch (prefetch=0 generates each batch in the consumer, on demand).
+
+Closing the iterator (close(), del, or leaving a for loop) stops and joins the thread; an error raised while
+generating is re-raised by the iterator.
+
+e.g.
+for obs, target, mask in env.iter_episodes(256, prefetch=4, seed=0):
+    ...
+"""
+
+from queue import Empty, Full, Queue
+import threading
+
+import numpy as np
+
+# how often a blocked producer checks whether the stream was closed, in seconds
+_POLL_S = 0.05
+_END = object()
+
+
+class _Failure(object):
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _batches(env, batch_size, rng, n_batches):
+    k = 0
+    while n_batches is None or k < n_batches:
+        obs, target, lengths = env._generate_batch(batch_size, rng)
+        mask = (np.arange(obs.shape[1]) < lengths[:, None]).astype(np.int64)
+        yield obs, target, mask
+        k += 1
+
+
+def _put(queue, item, stop):
+    # False when the stream was closed while waiting for room in the queue
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=_POLL_S)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def _produce(batches, queue, stop):
+    try:
+        for batch in batches:
+            if not _put(queue, batch, stop):
+                return
+        item = _END
+    except BaseException as e:
+        item = _Failure(e)
+    _put(queue, item, stop)
+
+
+def iter_episodes(env, batch_size, prefetch=2, seed=None, n_batches=None):
+    """
+    :param env: a task env, e.g. AX_12_CPT_ENV(size=100)
+    :param batch_size: the number of episodes N of a batch
+    :param prefetch: the number of batches generated ahead by the background thread, 0 for no thread
+    :param seed: the seed of the stream, default one drawn from env.np_random, so seeding the env seeds the stream
+    :param n_batches: the number of batches, default an endless stream
+    :return: an iterator of (obs, target, mask) int arrays of shape (N, T), see generate_dataset
+    """
+    if seed is None:
+        seed = int(env.np_random.integers(2 ** 63))
+    rng = np.random.Generator(np.random.PCG64(seed))
+    return _stream(_batches(env, batch_size, rng, n_batches), prefetch)
+
+
+def _stream(batches, prefetch):
+    if prefetch <= 0:
+        yield from batches
+        return
+
+    queue = Queue(maxsize=prefetch)
+    stop = threading.Event()
+    thread = threading.Thread(target=_produce, args=(batches, queue, stop), name="iter_episodes", daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                item = queue.get(timeout=_POLL_S)
+            except Empty:
+                if not thread.is_alive() and queue.empty():
+                    return
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
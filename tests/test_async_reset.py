@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs.task_env import make_task, registered_ids
+
+# a param of each env changed between two resets, e.g. by a curriculum
+PARAM_CHANGES = {
+    "12_AX-v0": ("size", 2),
+    "12_AX_S-v0": ("size", 2),
+    "AX_CPT-v0": ("size", 20),
+    "12_AX_CPT-v0": ("size", 8),
+    "seq_prediction-v0": ("size", 7),
+    "Simple_Copy-v0": ("size", 3),
+    "Simple_Copy-v1": ("mode", "minor"),
+    "Simple_Copy_Repeat-v0": ("repeat", 2),
+    "Simple_Copy_Repeat-v1": ("n_exclude", 2),
+    "Saccade-v0": ("n_trials", 3),
+}
+
+
+def episodes(env_id, async_reset, n_episodes=12, change_at=5):
+    kwargs = {} if env_id == "Saccade-v0" else {"fast": True}
+    env = make_task(env_id, async_reset=async_reset, defer_reset=True, **kwargs)
+    env.seed(0)
+    name, value = PARAM_CHANGES[env_id]
+    played = []
+    for k in range(n_episodes):
+        if k == change_at:
+            setattr(env, name, value)
+        env.reset()
+        if async_reset:
+            # the next episode is ready before the params change, so it is stale at the next reset
+            env._next_episode[-1].result()
+        played.append((np.asarray(env._obs_seq).copy(), np.asarray(env._target_seq).copy()))
+    env.close()
+    return played
+
+
+def test_every_env_has_a_param_change():
+    assert sorted(PARAM_CHANGES) == sorted(registered_ids())
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_async_episodes_are_the_sync_ones(env_id):
+    sync, async_ = episodes(env_id, False), episodes(env_id, True)
+    for (obs, target), (async_obs, async_target) in zip(sync, async_):
+        np.testing.assert_array_equal(async_obs, obs)
+        np.testing.assert_array_equal(async_target, target)
+    # the change applies from the reset after it
+    name, _ = PARAM_CHANGES[env_id]
+    if name in ("size", "repeat", "n_trials"):
+        assert len(sync[5][1]) != len(sync[4][1])
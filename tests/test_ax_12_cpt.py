@@ -0,0 +1,65 @@
+"""
+The batch generation of 12_AX_CPT (AXTaskEnv._generate_batch) against the reference loop
+(AX_12_CPT_ENV._generate_input_target_loop): the laws of the episode lengths, of the first digit, of the sets drawn
+under each stored digit and of the 'R' targets must be the same, by a chi-square test of homogeneity.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from gym_cog_ml_tasks.envs import AX_12_CPT_ENV
+
+N_EPISODES = 10000
+
+
+def parse(input_str):
+    """
+    :return: the first digit, and the (stored digit, set) of each set drawn after it
+    """
+    first = stored = input_str[0]
+    sets, i = [], 1
+    while i < len(input_str):
+        s = input_str[i] if input_str[i] in AX_12_CPT_ENV.DIGITS else input_str[i:i + 2]
+        i += len(s)
+        if s in AX_12_CPT_ENV.DIGITS:
+            stored = s
+        sets.append((stored, s))
+    return first, sets
+
+
+def statistics(episodes):
+    lengths, firsts, sets, targets = Counter(), Counter(), Counter(), Counter()
+    for input_str, target_str in episodes:
+        first, episode_sets = parse(input_str)
+        lengths[len(input_str)] += 1
+        firsts[first] += 1
+        sets.update(episode_sets)
+        targets.update(target_str)
+    return {"length": lengths, "first digit": firsts, "stored digit and set": sets, "target": targets}
+
+
+def assert_same_law(a, b, name):
+    keys = sorted(set(a) | set(b))
+    counts = np.array([[a[k] for k in keys], [b[k] for k in keys]], dtype=np.float64)
+    expected = counts.sum(axis=1, keepdims=True) * counts.sum(axis=0) / counts.sum()
+    chi2 = ((counts - expected) ** 2 / expected).sum()
+    dof = max(len(keys) - 1, 1)
+    # far beyond any plausible fluctuation of a chi-square of dof degrees of freedom
+    assert (chi2 - dof) / np.sqrt(2 * dof) < 6, "%s: chi2 %.1f for %d degrees of freedom" % (name, chi2, dof)
+
+
+@pytest.mark.parametrize("size, prob_target, prob_12", [(8, 0.5, 0.1), (5, 0.3, 0.3)])
+def test_batch_follows_the_loop(size, prob_target, prob_12):
+    env = AX_12_CPT_ENV(size=size, prob_target=prob_target, prob_12=prob_12, defer_reset=True)
+    env.seed(0)
+    obs, target, lengths = env._generate_batch(N_EPISODES)
+    batch = [env._decode_episode(o[:n], t[:n]) for o, t, n in zip(obs, target, lengths)]
+    env.seed(1)
+    loop = [env._generate_input_target_loop() for _ in range(N_EPISODES)]
+
+    batch_stats, loop_stats = statistics(batch), statistics(loop)
+    for name in batch_stats:
+        assert_same_law(batch_stats[name], loop_stats[name], name)
+    assert batch_stats["target"]["R"] > 0
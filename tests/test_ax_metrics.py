@@ -0,0 +1,66 @@
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs.task_env import make_task
+from gym_cog_ml_tasks.instrument import instrument, uninstrument
+
+AX_IDS = ["12_AX-v0", "12_AX_S-v0", "AX_CPT-v0", "12_AX_CPT-v0"]
+
+
+def play(env, n_episodes=5):
+    """
+    :return: the number of steps played
+    """
+    n_steps = 0
+    for _ in range(n_episodes):
+        env.reset()
+        done = False
+        while not done:
+            done = env.step(0)[2]
+            n_steps += 1
+    return n_steps
+
+
+def counted(metrics):
+    return sum(c["n"] for c in metrics.snapshot().values())
+
+
+def check_both_count(env, metrics, stats):
+    n_steps = play(env)
+    assert counted(metrics) == n_steps
+    assert stats.counts["step"] == n_steps
+    # the metrics keep counting without the instrumentation, which stops
+    uninstrument(env)
+    n_more = play(env)
+    assert counted(metrics) == n_steps + n_more
+    assert stats.counts["step"] == n_steps
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("env_id", AX_IDS)
+def test_track_metrics_then_instrument(env_id, fast):
+    env = make_task(env_id, fast=fast)
+    metrics = env.track_metrics()
+    stats = instrument(env)
+    check_both_count(env, metrics, stats)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("env_id", AX_IDS)
+def test_instrument_then_track_metrics(env_id, fast):
+    env = make_task(env_id, fast=fast)
+    stats = instrument(env)
+    metrics = env.track_metrics()
+    check_both_count(env, metrics, stats)
+
+
+def test_track_metrics_again_switches_the_metrics():
+    env = make_task("12_AX-v0")
+    first = env.track_metrics()
+    second = env.track_metrics()
+    n_steps = play(env)
+    assert counted(first) == 0
+    assert counted(second) == n_steps
+    env.metrics = None
+    play(env)
+    assert counted(second) == n_steps
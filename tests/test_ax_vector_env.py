@@ -0,0 +1,64 @@
+import gc
+from multiprocessing import shared_memory
+import time
+
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs import AX_12_ENV, AX_Shared_Vector_ENV, AX_Vector_ENV
+
+
+def test_vector_render_modes(capsys):
+    env = AX_Vector_ENV(AX_12_ENV, num_envs=3)
+    env.step([0, 1, 0])
+    text = env.render(mode='ansi')
+    assert text.count("Lane ") == 3 and "position 1/" in text
+    assert env.render() is None
+    assert capsys.readouterr().out == text
+    with pytest.raises(NotImplementedError):
+        env.render(mode='rgb_array')
+
+
+def test_shared_vector_render_modes(capsys):
+    env = AX_Shared_Vector_ENV(AX_12_ENV, num_envs=4, num_workers=2)
+    try:
+        env.step([0, 1, 0, 1])
+        text = env.render(mode='ansi')
+        assert text.count("Lane ") == 4 and "over 2 workers" in text
+        assert env.render() is None
+        assert capsys.readouterr().out == text
+        with pytest.raises(NotImplementedError):
+            env.render(mode='rgb_array')
+    finally:
+        env.close()
+
+
+def test_vector_task_is_deferred():
+    env = AX_Vector_ENV(AX_12_ENV, num_envs=3, defer_reset=True)
+    assert env.task._obs_seq is None and env.task._input_str is None
+
+
+def test_shared_vector_is_freed_without_close():
+    env = AX_Shared_Vector_ENV(AX_12_ENV, num_envs=4, num_workers=2)
+    names = [shm.name for shm in env._blocks.values()]
+    workers = list(env._workers)
+    del env
+    gc.collect()
+    assert not any(p.is_alive() for p in workers)
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_shared_vector_reports_a_dead_worker_at_once():
+    env = AX_Shared_Vector_ENV(AX_12_ENV, num_envs=4, num_workers=2, timeout=60.0)
+    try:
+        env._workers[0].kill()
+        env._workers[0].join()
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError, match="dead"):
+            env.step([0, 0, 0, 0])
+    finally:
+        env.close()
+    assert time.perf_counter() - start < 10
+    assert not any(p.is_alive() for p in env._workers)
@@ -0,0 +1,69 @@
+"""
+The samplers of the v1 copy tasks (see gym_cog_ml_tasks.envs.copy_tasks.copy_sampling) against the exact laws of
+their modes, on inputs small enough to enumerate:
+- full: uniform over all the inputs;
+- major: uniform over the inputs without any excluded char;
+- minor: uniform over the inputs with at least one excluded char.
+No input out of the support may be drawn, and the frequencies of the inputs must pass a chi-square test.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from gym_cog_ml_tasks.envs import Copy_Repeat_v1_ENV, Simple_Copy_v1_ENV
+from gym_cog_ml_tasks.envs.copy_tasks.copy_sampling import sample_inputs
+
+N_SAMPLES = 100000
+SEED = 0
+# (n_char, size, n_exclude)
+CASES = [(2, 4, 1), (3, 3, 1), (3, 3, 2), (4, 3, 3), (5, 2, 4), (4, 3, 4), (3, 1, 1), (6, 2, 2)]
+MODE_CASES = [(n_char, size, n_exclude, mode) for n_char, size, n_exclude in CASES for mode in ("full", "major", "minor")
+              if mode != "major" or n_exclude < n_char]
+
+
+def exact_law(n_char, size, n_exclude, mode):
+    """
+    :return: the probability of each input, indexed as the base n_char number of its chars
+    """
+    inputs = np.array(list(itertools.product(range(n_char), repeat=size))).reshape(-1, size)
+    excluded = ((inputs - np.arange(size)) % n_char < n_exclude).any(axis=1)
+    support = {"full": np.ones(len(inputs), dtype=bool), "major": ~excluded, "minor": excluded}[mode]
+    return support / support.sum()
+
+
+def assert_follows_law(inputs, n_char, size, n_exclude, mode):
+    law = exact_law(n_char, size, n_exclude, mode)
+    counts = np.bincount(inputs @ (n_char ** np.arange(size - 1, -1, -1)), minlength=len(law))
+    assert not counts[law == 0].any(), "inputs drawn out of the support"
+    expected = law[law > 0] * len(inputs)
+    chi2 = ((counts[law > 0] - expected) ** 2 / expected).sum()
+    dof = max(len(expected) - 1, 1)
+    # far beyond any plausible fluctuation of a chi-square of dof degrees of freedom
+    assert (chi2 - dof) / np.sqrt(2 * dof) < 6, "chi2 %.1f for %d degrees of freedom" % (chi2, dof)
+
+
+@pytest.mark.parametrize("n_char, size, n_exclude, mode", MODE_CASES)
+def test_sample_inputs(n_char, size, n_exclude, mode):
+    rng = np.random.default_rng(SEED)
+    assert_follows_law(sample_inputs(rng, N_SAMPLES, size, n_char, mode, n_exclude), n_char, size, n_exclude, mode)
+
+
+@pytest.mark.parametrize("n_char, size, n_exclude, mode", MODE_CASES)
+def test_copy_repeat_v1(n_char, size, n_exclude, mode):
+    env = Copy_Repeat_v1_ENV(n_char=n_char, size=size, mode=mode, n_exclude=n_exclude, defer_reset=True)
+    env.seed(SEED)
+    assert_follows_law(env._generate_batch(N_SAMPLES)[0][:, :size], n_char, size, n_exclude, mode)
+
+
+@pytest.mark.parametrize("n_char, size, n_exclude, mode", [case for case in MODE_CASES if case[2] == 1])
+def test_simple_copy_v1(n_char, size, n_exclude, mode):
+    env = Simple_Copy_v1_ENV(n_char=n_char, size=size, mode=mode, defer_reset=True)
+    env.seed(SEED)
+    assert_follows_law(env._generate_batch(N_SAMPLES)[0], n_char, size, n_exclude, mode)
+
+
+def test_major_needs_an_allowed_char():
+    with pytest.raises(ValueError):
+        sample_inputs(np.random.default_rng(SEED), 1, 3, 4, "major", n_exclude=4)
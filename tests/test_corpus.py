@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.corpus import EpisodeCorpus, write_corpus
+from gym_cog_ml_tasks.envs.task_env import make_task
+
+
+@pytest.mark.parametrize("env_id, kwargs", [
+    ("12_AX_CPT-v0", {"size": 12}),
+    ("Simple_Copy_Repeat-v1", {"n_char": 7, "size": 4, "mode": "minor"}),
+    ("Saccade-v0", {"n_trials": 2}),
+])
+def test_write_read_replay(tmp_path, env_id, kwargs):
+    path = str(tmp_path / "corpus.bin")
+    seed = write_corpus(path, env_id, 25, seed=3, chunk_size=7, **kwargs)
+    corpus = EpisodeCorpus(path)
+    assert (corpus.env_id, corpus.kwargs, corpus.seed, len(corpus)) == (env_id, kwargs, seed, 25)
+    assert corpus.header["chunk_size"] == 7
+
+    # the episodes are the ones of the env seeded alike, generated in chunks of 7
+    env = make_task(env_id, defer_reset=True, **kwargs)
+    env.seed(seed)
+    expected = []
+    for n in (7, 7, 7, 4):
+        obs, target, lengths = env._generate_batch(n)
+        expected += [(o[:l], t[:l]) for o, t, l in zip(obs, target, lengths)]
+    for i, (obs, target) in enumerate(expected):
+        np.testing.assert_array_equal(corpus[i][0], obs)
+        np.testing.assert_array_equal(corpus[i][1], target)
+
+    # replay feeds them to reset() in order
+    replayed = corpus.make_env([4, 2])
+    for i in (4, 2, 4):
+        np.testing.assert_array_equal(replayed._episode_target(), expected[i][1])
+        replayed.reset()
+
+
+def test_chunk_size_changes_the_episodes(tmp_path):
+    paths = [str(tmp_path / "a.bin"), str(tmp_path / "b.bin")]
+    write_corpus(paths[0], "12_AX-v0", 20, seed=0, chunk_size=7)
+    write_corpus(paths[1], "12_AX-v0", 20, seed=0)
+    a, b = EpisodeCorpus(paths[0]), EpisodeCorpus(paths[1])
+    assert a.header["chunk_size"] != b.header["chunk_size"]
+
+
+@pytest.mark.parametrize("env_id, kwargs", [
+    ("12_AX-v0", {}),
+    ("Simple_Copy-v0", {"n_char": 6}),
+])
+def test_replay_rejects_another_env(tmp_path, env_id, kwargs):
+    path = str(tmp_path / "corpus.bin")
+    write_corpus(path, "Simple_Copy-v0", 5, seed=0, n_char=20)
+    env = make_task(env_id, defer_reset=True, **kwargs)
+    with pytest.raises(ValueError):
+        env.replay(EpisodeCorpus(path))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 13])
+@pytest.mark.parametrize("env_id, kwargs", [
+    # 3-bit obs and 1-bit targets
+    ("12_AX_CPT-v0", {"size": 6}),
+    # 3-bit obs and targets
+    ("Simple_Copy-v1", {"n_char": 5, "size": 3}),
+    ("Saccade-v0", {}),
+])
+def test_packed_reads_like_plain(tmp_path, env_id, kwargs, chunk_size):
+    paths = [str(tmp_path / "plain.bin"), str(tmp_path / "packed.bin")]
+    for path, packed in zip(paths, (False, True)):
+        write_corpus(path, env_id, 150, seed=5, chunk_size=chunk_size, packed=packed, **kwargs)
+    plain, packed = EpisodeCorpus(paths[0]), EpisodeCorpus(paths[1])
+    assert packed.packed_bits is not None and 3 in packed.packed_bits
+    assert (len(packed), packed.n_tokens) == (len(plain), plain.n_tokens)
+    np.testing.assert_array_equal(packed.lengths, plain.lengths)
+
+    for i in (0, 1, 63, 64, 65, 127, 128, 149, -1):
+        for a, b in zip(packed[i], plain[i]):
+            np.testing.assert_array_equal(a, b)
+    rng = np.random.default_rng(0)
+    indices = np.concatenate([rng.integers(0, len(plain), size=40), [0, 64, 149]])
+    np.testing.assert_array_equal(packed.starts(indices), plain.starts(indices))
+    for a, b in zip(packed.episodes(indices), plain.episodes(indices)):
+        np.testing.assert_array_equal(a, b)
+    for length in (1, 7, 16):
+        starts = np.concatenate([rng.integers(0, plain.n_tokens - length + 1, size=40), [0, plain.n_tokens - length]])
+        for a, b in zip(packed.windows(starts, length), plain.windows(starts, length)):
+            np.testing.assert_array_equal(a, b)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs.task_env import make_task, registered_ids
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_episode_is_an_array_pair(env_id):
+    obs, target = make_task(env_id, defer_reset=True).episode(3)
+    assert type(obs) is np.ndarray and type(target) is np.ndarray
+    assert obs.shape == target.shape
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_episode_is_the_same_across_calls_and_envs(env_id):
+    env, other = make_task(env_id, defer_reset=True), make_task(env_id, defer_reset=True)
+    other.seed(123)
+    for index in (0, 3, 10 ** 12):
+        obs, target = env.episode(index, seed=7)
+        for again in (env.episode(index, seed=7), other.episode(index, seed=7)):
+            np.testing.assert_array_equal(again[0], obs)
+            np.testing.assert_array_equal(again[1], target)
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_episode_depends_on_index_and_seed(env_id):
+    env = make_task(env_id, defer_reset=True)
+    first = env.episode(0, seed=7)
+    episodes = [env.episode(i, seed=7) for i in range(1, 20)] + [env.episode(0, seed=s) for s in range(8, 27)]
+    assert any(e[0].shape != first[0].shape or (e[1] != first[1]).any() for e in episodes)
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_generate_episodes_matches_episode(env_id):
+    env = make_task(env_id, defer_reset=True)
+    obs, target, mask = env.generate_episodes(5, 9, seed=7)
+    for k, index in enumerate(range(5, 9)):
+        o, t = env.episode(index, seed=7)
+        length = int(mask[k].sum())
+        np.testing.assert_array_equal(obs[k, :length], o)
+        np.testing.assert_array_equal(target[k, :length], t)
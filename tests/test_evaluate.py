@@ -0,0 +1,32 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs.task_env import make_task, registered_ids
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_evaluate_batch_matches_evaluate(env_id):
+    env = make_task(env_id, defer_reset=True)
+    env.seed(0)
+    obs, target, mask = env.generate_dataset(6)
+    actions = np.where(np.random.default_rng(0).random(target.shape) < 0.5, target, 0)
+    rewards, totals, accuracies = env.evaluate_batch(actions, target, mask)
+    for k in range(len(target)):
+        length = int(mask[k].sum())
+        np.testing.assert_array_equal(rewards[k, length:], 0)
+        assert totals[k] == rewards[k, :length].sum()
+        assert accuracies[k] == (actions[k, :length] == target[k, :length]).mean()
+
+
+def test_evaluate_batch_of_an_empty_row():
+    env = make_task("12_AX-v0", defer_reset=True)
+    obs, target, mask = env.generate_dataset(3)
+    mask[1] = 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        rewards, totals, accuracies = env.evaluate_batch(target, target, mask)
+    assert accuracies.tolist() == [1.0, 0.0, 1.0]
+    assert totals[1] == 0 and not rewards[1].any()
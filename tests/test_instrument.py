@@ -0,0 +1,18 @@
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs.task_env import make_task, registered_ids
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_instrument_a_deferred_env(env_id, fast):
+    kwargs = {"fast": True} if fast and env_id != "Saccade-v0" else {}
+    env = make_task(env_id, defer_reset=True, **kwargs)
+    assert env.episode_length == 0
+    stats = env.instrument()
+    env.reset()
+    env.step(0)
+    assert stats.counts["reset"] == 1 and stats.counts["step"] == 1
+    assert stats.counts["generate"] == 1
+    assert dict(stats.lengths) == {env.episode_length: 1}
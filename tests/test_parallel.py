@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.corpus import EpisodeCorpus
+from gym_cog_ml_tasks.parallel import generate_dataset_parallel, write_corpus_parallel
+
+CASES = [("12_AX_CPT-v0", {"size": 10}), ("Simple_Copy_Repeat-v1", {"n_char": 6, "mode": "minor"})]
+
+
+@pytest.mark.parametrize("env_id, kwargs", CASES)
+def test_dataset_is_the_same_for_any_worker_count(env_id, kwargs):
+    single, pooled = (generate_dataset_parallel(env_id, 53, seed=4, shard_size=10, max_workers=n, **kwargs)
+                      for n in (1, 2))
+    for a, b in zip(single, pooled):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize("env_id, kwargs", CASES)
+def test_corpus_is_the_same_for_any_worker_count(tmp_path, env_id, kwargs, packed):
+    paths = [str(tmp_path / ("%d.bin" % n)) for n in (1, 2)]
+    for path, n in zip(paths, (1, 2)):
+        write_corpus_parallel(path, env_id, 53, seed=4, shard_size=10, max_workers=n, packed=packed, **kwargs)
+    with open(paths[0], "rb") as a, open(paths[1], "rb") as b:
+        assert a.read() == b.read()
+    # and holds the episodes of generate_dataset_parallel
+    obs, target, mask = generate_dataset_parallel(env_id, 53, seed=4, shard_size=10, max_workers=1, **kwargs)
+    corpus = EpisodeCorpus(paths[0])
+    for a, b in zip(corpus.episodes(np.arange(53)), (obs, target, mask)):
+        np.testing.assert_array_equal(a, b[:, :a.shape[1]])
@@ -0,0 +1,81 @@
+"""
+The seeding contract (see gym_cog_ml_tasks.envs.task_env) of every registered env, in this process and in worker
+processes started by fork and by spawn.
+"""
+
+import hashlib
+import multiprocessing
+
+import numpy as np
+import pytest
+
+import gym_cog_ml_tasks
+from gym_cog_ml_tasks.envs import AX_12_ENV, AX_Vector_ENV
+from gym_cog_ml_tasks.envs.task_env import make_task, registered_ids
+
+N_WORKERS = 3
+METHODS = [m for m in ("fork", "spawn") if m in multiprocessing.get_all_start_methods()]
+
+
+def episodes_digest(env_id, seed=None, n_episodes=20):
+    """
+    :return: the digests of the obs and targets of n_episodes played through reset() and step(),
+             and of n_episodes generated by generate_dataset()
+    """
+    env = make_task(env_id)
+    if seed is not None:
+        env.seed(seed)
+    played = hashlib.sha1()
+    for _ in range(n_episodes):
+        played.update(repr(env.reset()).encode())
+        done = False
+        while not done:
+            obs, reward, done, info = env.step(0)
+            played.update(repr((obs, info["target_act"])).encode())
+    generated = hashlib.sha1()
+    for a in env.generate_dataset(n_episodes):
+        generated.update(a.tobytes())
+    return played.hexdigest(), generated.hexdigest()
+
+
+def assert_all_different(digests):
+    for d in zip(*digests):
+        assert len(set(d)) == len(digests)
+
+
+@pytest.fixture(scope="module", params=METHODS)
+def pool(request):
+    # forked workers inherit this state, it must not make their episodes equal
+    np.random.seed(0)
+    with multiprocessing.get_context(request.param).Pool(N_WORKERS) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_same_seed_same_episodes(env_id):
+    assert episodes_digest(env_id, 0) == episodes_digest(env_id, 0)
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_different_seeds_diverge(env_id):
+    assert_all_different([episodes_digest(env_id, seed) for seed in range(N_WORKERS)])
+
+
+@pytest.mark.parametrize("env_id", registered_ids())
+def test_worker_lanes(pool, env_id):
+    same = pool.starmap(episodes_digest, [(env_id, 0)] * N_WORKERS)
+    assert set(same) == {episodes_digest(env_id, 0)}
+    assert_all_different(pool.starmap(episodes_digest, [(env_id, seed) for seed in range(N_WORKERS)]))
+    assert_all_different(pool.starmap(episodes_digest, [(env_id, None)] * N_WORKERS))
+
+
+def test_vector_lanes_are_independent():
+    env = AX_Vector_ENV(AX_12_ENV, num_envs=8)
+    env.seed(0)
+    env.reset()
+    rows = {row.tobytes() for row in env.obs_mat}
+    assert len(rows) == env.num_envs
+    first = env.obs_mat.copy()
+    env.seed(0)
+    env.reset()
+    np.testing.assert_array_equal(env.obs_mat, first)